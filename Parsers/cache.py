@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CACHE_DIR_ENV = "MESH_EDITOR_CACHE"  # e.g. MESH_EDITOR_CACHE=~/.cache/mesh_editor turns the cache on
+DEFAULT_MAX_BYTES = 2 << 30
+ARRAYS = ("vertices", "faces", "normals")
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class _FileLock:
+    """Exclusive lock on a file, held across processes (flock, or msvcrt on Windows)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+class MeshCache:
+    """On-disk cache of parsed and welded STL meshes, shared by all processes using `directory`.
+
+    Each entry is a directory of .npy files (vertices, faces, normals) plus meta.json, named
+    after a key built from the file and the weld tolerance:
+      "stat"    - absolute path, size and modification time (no reading; the default)
+      "content" - a hash of the file's bytes, so copies and renamed files hit as well
+
+    Entries are written to a temporary directory and renamed into place, so readers never see
+    a partial entry, and are never modified after that. Hits are loaded with mmap_mode 'c'
+    (copy-on-write), so only the pages used are read. A hit refreshes the entry's mtime; when
+    the cache grows past max_bytes the least recently used entries are evicted, under a lock
+    file so several processes can store at once.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, key="stat"):
+        if key not in ("stat", "content"):
+            raise ValueError(f"Unknown cache key: {key}. Use 'stat' or 'content'")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.key_mode = key
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock_path = os.path.join(self.directory, ".lock")
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def key(self, filepath, weld_eps=0.0):
+        digest = hashlib.blake2b(digest_size=20)
+        if self.key_mode == "content":
+            with open(filepath, 'rb') as f:
+                while block := f.read(HASH_CHUNK_SIZE):
+                    digest.update(block)
+        else:
+            stat = os.stat(filepath)
+            digest.update(f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        digest.update(f"|{weld_eps!r}".encode())
+        return digest.hexdigest()
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        """The cached (vertices, faces, normals, meta) for key, or None."""
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+            arrays = [np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='c') for name in ARRAYS]
+            os.utime(entry)
+        except (OSError, ValueError):
+            # Missing, or evicted by another process while we were reading it
+            self._count("misses")
+            return None
+        self._count("hits")
+        return (*arrays, meta)
+
+    def put(self, key, vertices, faces, normals, **meta):
+        """Store an entry; if another process stored the same key first, theirs is kept."""
+        entry = os.path.join(self.directory, key)
+        temp = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            for name, array in zip(ARRAYS, (vertices, faces, normals)):
+                np.save(os.path.join(temp, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(temp, "meta.json"), 'w') as f:
+                json.dump(meta, f)
+            try:
+                os.replace(temp, entry)
+            except OSError:
+                return
+        finally:
+            shutil.rmtree(temp, ignore_errors=True)
+        self._count("stores")
+        self.evict()
+
+    def entries(self):
+        """(last use, bytes, path) of every published entry."""
+        result = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.is_dir() or item.name.startswith("."):
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(item.path))
+                    result.append((item.stat().st_mtime, size, item.path))
+                except OSError:
+                    continue
+        return result
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with _FileLock(self.lock_path):
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                # Processes that have the entry mapped keep their pages (POSIX unlink semantics)
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                self._count("evictions")
+
+    def clear(self):
+        with _FileLock(self.lock_path):
+            for _, _, path in self.entries():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self):
+        entries = self.entries()
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions,
+                "entries": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+
+_caches = {}
+
+
+def cache_from_env():
+    """The MeshCache for the directory in MESH_EDITOR_CACHE, or None when it is not set."""
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    if directory not in _caches:
+        _caches[directory] = MeshCache(directory)
+    return _caches[directory]
@@ -0,0 +1,97 @@
+import os
+import struct
+
+import numpy as np
+
+from geometry.weld import weld
+from Parsers.stl import FACET_DTYPE, STLParser, detect_format
+
+# Facets handled per step when streaming over a mapping (about 50 MB)
+MAPPED_CHUNK_SIZE = 1 << 20
+
+
+class MappedSTL:
+    """Read-only, zero-copy view of a binary STL file backed by np.memmap.
+
+    Nothing is read until it is used: triangles, normals and attributes are views into the
+    mapping, slicing returns another MappedSTL over the same pages, and the welded
+    vertices/faces are only built by to_mesh().
+    """
+
+    def __init__(self, filepath, facets=None):
+        self.filepath = filepath
+        self.origin = [0.0, 0.0, 0.0]
+        if facets is None:
+            facets = self._map(filepath)
+        self.facets = facets
+
+    @staticmethod
+    def _map(filepath):
+        with open(filepath, 'rb') as f:
+            f.seek(80)
+            count = struct.unpack('<I', f.read(4))[0]
+        expected = 84 + count * FACET_DTYPE.itemsize
+        if os.path.getsize(filepath) < expected:
+            raise ValueError(f"Truncated STL file {filepath}: expected {expected} bytes")
+        if count == 0:
+            return np.zeros(0, dtype=FACET_DTYPE)
+        return np.memmap(filepath, dtype=FACET_DTYPE, mode='r', offset=84, shape=(count,))
+
+    def __len__(self):
+        return len(self.facets)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            key = slice(key, key + 1 if key != -1 else None)
+        return MappedSTL(self.filepath, self.facets[key])
+
+    @property
+    def triangles(self):
+        return self.facets['vertices']
+
+    @property
+    def normals(self):
+        return self.facets['normal']
+
+    @property
+    def attributes(self):
+        return self.facets['attr']
+
+    def iter_chunks(self, chunk_size=MAPPED_CHUNK_SIZE):
+        for start in range(0, len(self), chunk_size):
+            yield self[start:start + chunk_size]
+
+    def bounds(self, chunk_size=MAPPED_CHUNK_SIZE):
+        """Axis-aligned bounding box as (min, max), streamed chunk by chunk."""
+        lower = np.full(3, np.inf, dtype=np.float32)
+        upper = np.full(3, -np.inf, dtype=np.float32)
+        for chunk in self.iter_chunks(chunk_size):
+            points = chunk.triangles.reshape(-1, 3)
+            np.minimum(lower, points.min(axis=0), out=lower)
+            np.maximum(upper, points.max(axis=0), out=upper)
+        return lower, upper
+
+    def surface_area(self, chunk_size=MAPPED_CHUNK_SIZE):
+        area = 0.0
+        for chunk in self.iter_chunks(chunk_size):
+            t = chunk.triangles.astype(np.float64)
+            area += 0.5 * np.linalg.norm(np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0]), axis=1).sum()
+        return area
+
+    def to_mesh(self, weld_eps=0.0):
+        """Weld the facets into (vertices, faces) arrays."""
+        vertices, inverse, _ = weld(self.triangles.reshape(-1, 3), weld_eps)
+        return vertices, inverse.reshape(-1, 3)
+
+    def tessellate(self):
+        vertices, faces = self.to_mesh()
+        return vertices + np.asarray(self.origin, dtype=vertices.dtype), faces
+
+
+def iter_facets(filepath, chunk_size=MAPPED_CHUNK_SIZE):
+    """Yield (normals, triangles) chunks from a binary or ASCII STL file without loading it whole."""
+    if detect_format(filepath) == 'binary':
+        for chunk in MappedSTL(filepath).iter_chunks(chunk_size):
+            yield chunk.normals, chunk.triangles
+    else:
+        yield from STLParser().iter_ascii(filepath)
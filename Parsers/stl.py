@@ -1,91 +1,238 @@
+import os
 import struct
 
 import numpy as np
 
+from geometry.normals import face_normals, triangle_normals
+from geometry.weld import weld
+from Parsers.cache import MeshCache, cache_from_env
+
+# Binary STL facet record: normal, three vertices and the attribute byte count (50 bytes, packed)
+FACET_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attr', '<u2'),
+])
+
+STL_FORMATS = ('ascii', 'binary')
+ASCII_EXTENSIONS = ('.stla', '.ast')
+# Must not start with "solid", or readers would take the file for ASCII
+BINARY_HEADER = b'binary STL MeshEditor'.ljust(80, b' ')
+ASCII_CHUNK_SIZE = 1 << 24
+
+
+def _parse_ascii_facets(data, filepath):
+    """Parse whole facets from a block of ASCII STL text into an (n, 4, 3) array: normal + 3 vertices."""
+    tokens = np.array(data.split())
+    if tokens.size == 0:
+        return np.zeros((0, 4, 3))
+    starts = np.flatnonzero((tokens == b'normal') | (tokens == b'vertex'))
+    if len(starts) % 4 or np.any(tokens[starts[::4]] != b'normal') or (len(starts) and starts[-1] + 3 >= tokens.size):
+        raise ValueError(f"Malformed ASCII STL file {filepath}: every facet needs a normal and 3 vertices")
+    try:
+        values = tokens[starts[:, None] + np.arange(1, 4)].astype(np.float64)
+    except ValueError as e:
+        raise ValueError(f"Malformed ASCII STL file {filepath}: {e}") from None
+    return values.reshape(-1, 4, 3)
+
+
+def format_for_path(filepath):
+    """Pick the STL flavour from the extension: .stla/.ast are ASCII, anything else is binary."""
+    return 'ascii' if os.path.splitext(filepath)[1].lower() in ASCII_EXTENSIONS else 'binary'
+
+
+def detect_format(filepath):
+    """Tell binary from ASCII STL by checking the facet count against the file size."""
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        header = f.read(84)
+    if len(header) == 84 and size == 84 + FACET_DTYPE.itemsize * struct.unpack('<I', header[80:])[0]:
+        return 'binary'
+    return 'ascii' if header.lstrip().startswith(b'solid') else 'binary'
+
+
+class STLWriter:
+    """Write facets to an STL file chunk by chunk.
+
+    The binary facet count is not known up front, so a zero count is written first
+    and patched when the writer is closed.
+    """
+    FACET = ("facet normal {} {} {}\n"
+             "    outer loop\n"
+             "        vertex {} {} {}\n"
+             "        vertex {} {} {}\n"
+             "        vertex {} {} {}\n"
+             "    endloop\n"
+             "endfacet\n")
+
+    def __init__(self, filepath, stl_format=None):
+        self.filepath = filepath
+        self.stl_format = stl_format or format_for_path(filepath)
+        if self.stl_format not in STL_FORMATS:
+            raise ValueError(f"Unknown STL format: {self.stl_format}. Use one of {', '.join(STL_FORMATS)}")
+        self.count = 0
+        if self.stl_format == 'binary':
+            self.file = open(filepath, 'wb')
+            self.file.write(BINARY_HEADER)
+            self.file.write(struct.pack('<I', 0))
+        else:
+            self.file = open(filepath, 'w')
+            self.file.write("solid MeshEditor\n")
+
+    def write(self, triangles, normals=None):
+        """Append an (n, 3, 3) triangle array; normals are computed when not given."""
+        triangles = np.asarray(triangles).reshape(-1, 3, 3)
+        normals = triangle_normals(triangles) if normals is None else np.asarray(normals).reshape(-1, 3)
+        if self.stl_format == 'binary':
+            facets = np.zeros(len(triangles), dtype=FACET_DTYPE)
+            facets['vertices'] = triangles
+            facets['normal'] = normals
+            self.file.write(facets.tobytes())
+        else:
+            # numpy's str conversion gives the same shortest repr as formatting each scalar
+            rows = np.concatenate([normals.astype(str), triangles.reshape(-1, 9).astype(str)], axis=1)
+            self.file.writelines(self.FACET.format(*row) for row in rows.tolist())
+        self.count += len(triangles)
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.stl_format == 'binary':
+            if self.count > 0xFFFFFFFF:
+                raise ValueError(f"Too many facets for a binary STL file: {self.count}")
+            self.file.seek(80)
+            self.file.write(struct.pack('<I', self.count))
+        else:
+            self.file.write("endsolid MeshEditor\n")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 
 class STLParser:
-    def __init__(self):
+    def __init__(self, weld_eps=0.0, cache=None):
         self.vertices = []
         self.faces = []
         self.normals = []
+        self.weld_eps = weld_eps
+        self.merged_vertices = 0
+        # Optional MeshCache (or its directory) for parsed meshes; by default the one named by
+        # the MESH_EDITOR_CACHE environment variable, if set
+        self.cache = MeshCache(cache) if isinstance(cache, str) else cache or cache_from_env()
 
-    def write(self, filepath, vertices, faces, normals=None):
-        if normals is None:
-            normals = [self.calculate_normal([vertices[idx] for idx in face]) for face in faces]
-        with open(filepath, 'w') as f:
-            f.write("solid MeshEditor\n")
-            for i, face in enumerate(faces):
-                normal = normals[i]
-                f.write(f"facet normal {normal[0]} {normal[1]} {normal[2]}\n")
-                f.write("    outer loop\n")
-                for vertex_idx in face:
-                    vertex = vertices[vertex_idx]
-                    f.write(f"        vertex {vertex[0]} {vertex[1]} {vertex[2]}\n")
-                f.write("    endloop\n")
-                f.write("endfacet\n")
-            f.write("endsolid MeshEditor\n")
+    def write(self, filepath, vertices, faces, normals=None, stl_format=None):
+        """Write an STL file; the format is 'ascii', 'binary' or picked from the file extension."""
+        stl_format = stl_format or format_for_path(filepath)
+        if stl_format not in STL_FORMATS:
+            raise ValueError(f"Unknown STL format: {stl_format}. Use one of {', '.join(STL_FORMATS)}")
+        vertices = np.asarray(vertices)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        normals = face_normals(vertices, faces) if normals is None else np.asarray(normals)
+        if stl_format == 'binary':
+            self.write_binary(filepath, vertices, faces, normals)
+        else:
+            self.write_ascii(filepath, vertices, faces, normals)
         print(f"STL saved to {filepath}")
 
-    def read(self, filepath):
-        self.vertices = []
-        self.faces = []
-        self.normals = []
-        vertex_map = {}
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                if line.startswith("facet normal"):
-                    normal = [float(x) for x in line.split()[2:5]]
-                    self.normals.append(normal)
-                    i += 1
-                    current_vertices = []
-                    for j in range(3):
-                        vertex_line = lines[i + j].strip()
-                        if vertex_line.startswith("vertex"):
-                            vertex = tuple(float(x) for x in vertex_line.split()[1:4])
-                            if vertex not in vertex_map:
-                                vertex_map[vertex] = len(self.vertices)
-                                self.vertices.append(vertex)
-                            current_vertices.append(vertex_map[vertex])
-                    self.faces.append(current_vertices)
-                    i += 3
-                i += 1
-        self.vertices = np.array(self.vertices)
-        self.faces = np.array(self.faces)
-        print(f"STL loaded from {filepath}: {len(self.faces)} facets")
+    def write_ascii(self, filepath, vertices, faces, normals, chunk_size=65536):
+        with STLWriter(filepath, 'ascii') as writer:
+            for start in range(0, len(faces), chunk_size):
+                end = start + chunk_size
+                writer.write(vertices[faces[start:end]], normals[start:end])
+
+    def write_binary(self, filepath, vertices, faces, normals):
+        with STLWriter(filepath, 'binary') as writer:
+            writer.write(vertices[faces], normals)
+
+    def load(self, filepath):
+        """Read an STL file of either flavour."""
+        if detect_format(filepath) == 'binary':
+            self.read_binary(filepath)
+        else:
+            self.read(filepath)
+
+    def _cache_key(self, filepath):
+        return None if self.cache is None else self.cache.key(filepath, self.weld_eps)
+
+    def _load_cached(self, filepath, key):
+        """Fill vertices/faces/normals from the cache; False on a miss."""
+        cached = self.cache.get(key)
+        if cached is None:
+            return False
+        self.vertices, self.faces, self.normals, meta = cached
+        self.merged_vertices = meta["merged_vertices"]
+        print(f"STL loaded from {filepath} (cached): {len(self.faces)} facets, {len(self.vertices)} vertices")
+        return True
 
+    def _store_cached(self, key):
+        if key is not None:
+            self.cache.put(key, self.vertices, self.faces, self.normals, merged_vertices=int(self.merged_vertices))
+
+    def read(self, filepath, chunk_size=ASCII_CHUNK_SIZE):
+        key = self._cache_key(filepath)
+        if key is not None and self._load_cached(filepath, key):
+            return
+        normals = []
+        triangles = []
+        for chunk_normals, chunk_triangles in self.iter_ascii(filepath, chunk_size):
+            normals.append(chunk_normals)
+            triangles.append(chunk_triangles)
+        normals = np.concatenate(normals) if normals else np.zeros((0, 3))
+        triangles = np.concatenate(triangles) if triangles else np.zeros((0, 3, 3))
+
+        self.vertices, inverse, self.merged_vertices = weld(triangles.reshape(-1, 3), self.weld_eps)
+        self.faces = inverse.reshape(-1, 3)
+        self.normals = normals
+        print(f"STL loaded from {filepath}: {len(self.faces)} facets, {len(self.vertices)} vertices")
+        self._store_cached(key)
+
+    def iter_ascii(self, filepath, chunk_size=ASCII_CHUNK_SIZE):
+        """Yield (normals, triangles) arrays for each block of an ASCII STL file.
+
+        The file is read chunk_size bytes at a time and cut after the last complete facet,
+        so memory use does not depend on the file size.
+        """
+        with open(filepath, 'rb') as f:
+            tail = b''
+            while True:
+                block = f.read(chunk_size)
+                data = tail + block
+                if block:
+                    cut = data.rfind(b'endfacet')
+                    if cut < 0:
+                        tail = data
+                        continue
+                    cut += len(b'endfacet')
+                    data, tail = data[:cut], data[cut:]
+                facets = _parse_ascii_facets(data, filepath)
+                if len(facets):
+                    yield facets[:, 0], facets[:, 1:]
+                if not block:
+                    break
 
     def read_binary(self, file_path):
         """Read a binary STL file."""
-        self.vertices = []
-        self.faces = []
-        vertex_map = {}
-        current_vertex_index = 0
-
+        key = self._cache_key(file_path)
+        if key is not None and self._load_cached(file_path, key):
+            return
         with open(file_path, 'rb') as f:
             f.seek(80)
             num_triangles = struct.unpack('<I', f.read(4))[0]
+            facets = np.fromfile(f, dtype=FACET_DTYPE, count=num_triangles)
+
+        if len(facets) < num_triangles:
+            raise ValueError(f"Truncated STL file {file_path}: expected {num_triangles} facets, got {len(facets)}")
 
-            for _ in range(num_triangles):
-                f.read(12)
-                vertex_indices = []
-                for _ in range(3):
-                    vertex_data = struct.unpack('<fff', f.read(12))  # x, y, z
-                    vertex = tuple(vertex_data)
-                    if vertex not in vertex_map:
-                        vertex_map[vertex] = current_vertex_index
-                        self.vertices.append(vertex)
-                        current_vertex_index += 1
-                    vertex_indices.append(vertex_map[vertex])
-                self.faces.append(vertex_indices)
-                f.read(2)
+        self.vertices, inverse, self.merged_vertices = weld(facets['vertices'].reshape(-1, 3), self.weld_eps)
+        self.faces = inverse.reshape(-1, 3)
+        self.normals = facets['normal'].copy()
+        print(f"STL loaded from {file_path}: {len(self.faces)} facets, {len(self.vertices)} vertices")
+        self._store_cached(key)
 
     def calculate_normal(self, vertices):
-        v0, v1, v2 = vertices
-        edge1 = np.array(v1) - np.array(v0)
-        edge2 = np.array(v2) - np.array(v0)
-        normal = np.cross(edge1, edge2)
-        norm = np.linalg.norm(normal)
-        return normal / norm if norm != 0 else normal
\ No newline at end of file
+        """Unit normal of one triangle; use face_normals() for many at once."""
+        return triangle_normals(np.asarray(vertices, dtype=np.float64)[None])[0]
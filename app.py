@@ -1,3 +1,18 @@
+import csv
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Chunks in flight per worker; bounds how many jobs are re-run after a worker dies
+CHUNKS_PER_WORKER = 2
+# Key of a manifest row that could not be parsed; the job fails with this message
+MANIFEST_ERROR = "manifest_error"
+
+
 class Application:
     def __init__(self):
         self.commands = {}
@@ -10,3 +25,190 @@ class Application:
             self.commands[name](**kwargs).execute()
         else:
             print(f"Unknown command: {name}")
+
+    def execute_many(self, jobs, max_workers=None, chunksize=1):
+        """Run many jobs in a process pool.
+
+        Each job is a dict with a "command" name and that command's keyword arguments.
+        Registered commands must be picklable (module-level functions or classes).
+        Returns one result per job, in order: index, command, ok, seconds and error.
+        A failing job is reported in its result and does not stop the others, including one
+        whose worker process dies (out of memory, a crash). The jobs that were in flight when a
+        worker died are re-run one at a time, each in a fresh process, so only the job that
+        kills its worker is reported as failed; the rest continue in a new pool.
+        """
+        jobs = list(enumerate(jobs))
+        chunksize = max(1, chunksize)
+        pending = deque(jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize))
+        results = [None] * len(jobs)
+        window = CHUNKS_PER_WORKER * (max_workers or os.cpu_count() or 1)
+        while pending:
+            suspects = []
+            with self._pool(max_workers) as pool:
+                running = {}
+                while pending or running:
+                    while pending and len(running) < window and not suspects:
+                        chunk = pending.popleft()
+                        running[pool.submit(_run_chunk, chunk)] = chunk
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk = running.pop(future)
+                        if not _collect(future, chunk, results):
+                            suspects.extend(chunk)
+            for index, job in suspects:
+                with self._pool(1) as solo:
+                    future = solo.submit(_run_chunk, [(index, job)])
+                    wait([future])
+                    if not _collect(future, [(index, job)], results):
+                        results[index] = _result(index, job, "BrokenProcessPool: the worker process died")
+        return results
+
+    def _pool(self, max_workers):
+        return ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(self.commands,))
+
+
+_worker_commands = {}
+
+
+def _init_worker(commands):
+    _worker_commands.update(commands)
+
+
+def _result(index, job, error, seconds=0.0):
+    return {"index": index, "command": job.get("command"), "ok": error is None, "seconds": seconds, "error": error}
+
+
+def _run_job(indexed_job):
+    index, job = indexed_job
+    kwargs = dict(job)
+    name = kwargs.pop("command", None)
+    start = time.perf_counter()
+    try:
+        if MANIFEST_ERROR in kwargs:
+            raise ValueError(kwargs[MANIFEST_ERROR])
+        if name not in _worker_commands:
+            raise ValueError(f"Unknown command: {name}")
+        _worker_commands[name](**kwargs).execute()
+        error = None
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:  # SystemExit from a command is a failed job too
+        error = f"{type(e).__name__}: {e}"
+    return _result(index, job, error, time.perf_counter() - start)
+
+
+def _run_chunk(chunk):
+    return [_run_job(indexed_job) for indexed_job in chunk]
+
+
+def _collect(future, chunk, results):
+    """Store a finished chunk's results; False if its worker process died."""
+    try:
+        for result in future.result():
+            results[result["index"]] = result
+    except BrokenProcessPool:
+        return False
+    except Exception as e:  # e.g. a job whose arguments could not be pickled
+        for index, job in chunk:
+            results[index] = _result(index, job, f"{type(e).__name__}: {e}")
+    return True
+
+
+def load_manifest(path):
+    """Read batch jobs from a JSON-lines (.jsonl/.json) or CSV (.csv) manifest.
+
+    A row that cannot be parsed (a bad number, broken JSON) becomes a job that fails with the
+    reason, so it is reported with the others instead of stopping the whole batch.
+    """
+    with open(path, newline='') as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            return [_parse_row(number, row) for number, row in enumerate(csv.DictReader(f), start=2)]
+        return [_parse_line(number, line) for number, line in enumerate(f, start=1) if line.strip()]
+
+
+def _parse_row(number, row):
+    cells = {key: value for key, value in row.items() if value and value.strip()}
+    try:
+        return {key: _coerce(key, value) for key, value in cells.items()}
+    except ValueError as e:
+        return {"command": cells.get("command", "").strip() or None, MANIFEST_ERROR: f"Row {number}: {e}"}
+
+
+def _parse_line(number, line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return {"command": None, MANIFEST_ERROR: f"Line {number}: {e}"}
+
+
+# Command parameters read from CSV manifests as numbers; every other column stays a string,
+# so file names like "001" or "2024" are not turned into ints
+INT_PARAMETERS = {"N", "sectors", "levels", "target", "size", "views", "supersample"}
+FLOAT_PARAMETERS = {"L", "R", "height", "base", "ratio", "max_error", "weld", "snap"}
+
+
+def _coerce(key, value):
+    """Turn a CSV cell into the type the command expects."""
+    value = value.strip()
+    if key == "origin":
+        return [float(x) for x in re.split(r"[,; ]+", value)]
+    if key in INT_PARAMETERS:
+        return int(value)
+    if key in FLOAT_PARAMETERS:
+        return float(value)
+    return value
+
+
+class Batch:
+    def __init__(self, app, manifest, workers=None, chunksize=1, report=None):
+        self.app = app
+        self.manifest = manifest
+        self.workers = workers
+        self.chunksize = chunksize
+        self.report = report
+
+    def load_jobs(self):
+        return load_manifest(self.manifest)
+
+    def execute(self):
+        jobs = self.load_jobs()
+        start = time.perf_counter()
+        results = self.app.execute_many(jobs, self.workers, self.chunksize)
+        elapsed = time.perf_counter() - start
+
+        failed = [r for r in results if not r["ok"]]
+        for r in failed:
+            print(f"Job {r['index']} ({r['command']}) failed: {r['error']}")
+        job_time = sum(r["seconds"] for r in results)
+        print(f"{type(self).__name__}: {len(results) - len(failed)}/{len(results)} jobs succeeded in {elapsed:.2f} s "
+              f"({job_time:.2f} s of job time)")
+
+        if self.report:
+            with open(self.report, 'w') as f:
+                f.writelines(json.dumps(r) + "\n" for r in results)
+            print(f"{type(self).__name__} report saved to {self.report}")
+        return results
+
+
+STL_EXTENSIONS = (".stl", ".stla", ".ast")
+
+
+class Thumbnails(Batch):
+    """Render a Thumbnail PNG for every STL file in a directory, across a process pool."""
+
+    def __init__(self, app, input_dir, output_dir, size=256, views=1, mode="FILLED", supersample=1,
+                 workers=None, chunksize=1, report=None):
+        super().__init__(app, None, workers, chunksize, report)
+        self.input_dir = input_dir
+        self.output_dir = output_dir or input_dir
+        self.options = {"size": size, "views": views, "mode": mode, "supersample": supersample}
+
+    def load_jobs(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        names = sorted(name for name in os.listdir(self.input_dir)
+                       if os.path.splitext(name)[1].lower() in STL_EXTENSIONS)
+        return [{"command": "Thumbnail", "input": os.path.join(self.input_dir, name),
+                 "filepath": os.path.join(self.output_dir, os.path.splitext(name)[0] + ".png"), **self.options}
+                for name in names]
@@ -0,0 +1,70 @@
+"""Frame time of GLRenderSystem.render as the scene grows, in an offscreen software context.
+
+Usage: python -m benchmarks.frame_time --shapes 1 10 100 --frames 50 [--legacy | --core]
+"""
+import argparse
+import itertools
+import time
+
+from benchmarks.headless import create_context, glEnable, glFinish, GL_DEPTH_TEST  # must come first
+
+from src.Render import GLRenderSystem
+from tesselation.sphere import Sphere
+
+
+def time_frames(render_system, frames, edit=False):
+    render_system.render()  # first frame uploads the buffers
+    glFinish()
+    start = time.perf_counter()
+    for frame in range(frames):
+        if edit:
+            shape = render_system.shapes[0]
+            vertex = shape.vertices[frame % len(shape.vertices)].copy()
+            vertex[0] += 0.001
+            render_system.move_vertex(0, frame % len(shape.vertices), vertex)
+        render_system.render()
+        glFinish()
+    return (time.perf_counter() - start) / frames, render_system.drawn_count, render_system.culled_count
+
+
+# Grid positions, spaced 1 apart, nearest the view centre first: with the default camera small
+# scenes are fully in view and larger ones spill out of the frustum at the edges
+GRID_SIZE = 20
+GRID = sorted(itertools.product(range(-GRID_SIZE // 2, GRID_SIZE // 2), repeat=2),
+              key=lambda p: (p[0] ** 2 + p[1] ** 2, p[1], p[0]))
+
+
+def layout(count):
+    """Origins for count shapes; past GRID_SIZE^2 shapes, further grids are stacked behind the first."""
+    return [[x, y, -(i // len(GRID))] for i, (x, y) in zip(range(count), itertools.cycle(GRID))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render frame time benchmark")
+    parser.add_argument("--shapes", type=int, nargs="+", default=[1, 10, 100], help="Scene sizes")
+    parser.add_argument("--N", type=int, default=64, help="Sphere tessellation level per shape")
+    parser.add_argument("--frames", type=int, default=50, help="Frames timed per scene")
+    parser.add_argument("--legacy", action="store_true", help="Use the fixed-function render path")
+    parser.add_argument("--core", action="store_true", help="Render in an OpenGL 3.3 core profile context")
+    parser.add_argument("--no-cull", action="store_true", help="Draw every shape, visible or not")
+    args = parser.parse_args()
+
+    if args.core and args.legacy:
+        parser.error("--legacy needs a compatibility context; drop --core")
+    context = create_context(core=args.core)
+    glEnable(GL_DEPTH_TEST)
+    for count in args.shapes:
+        spheres = [Sphere(R=0.2, origin=origin, N=args.N) for origin in layout(count)]
+        render_system = GLRenderSystem(spheres, legacy=args.legacy)
+        render_system.frustum_culling = not args.no_cull
+        static, drawn, culled = time_frames(render_system, args.frames)
+        print(f"{count:5d} shapes: {static * 1000:7.2f} ms/frame ({drawn} drawn, {culled} culled)")
+        edited, drawn, culled = time_frames(render_system, args.frames, edit=True)
+        print(f"{count:5d} shapes: {edited * 1000:7.2f} ms/frame with move_vertex ({drawn} drawn, {culled} culled)")
+        for shape in render_system.shapes:
+            shape.release()
+    del context
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Offscreen OpenGL context for running the renderer without a display.
+
+Uses Mesa's software rasterizer (llvmpipe) through EGL without a surface, or OSMesa when
+PYOPENGL_PLATFORM=osmesa. Import this module before anything that imports OpenGL, since
+PyOpenGL picks its platform on first import.
+"""
+import ctypes
+import os
+
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+from OpenGL.GL import *  # noqa: E402
+
+
+def create_context(width=800, height=600, core=False):
+    """Make an offscreen context current and return an object that must be kept alive.
+
+    core=True asks for a forward-compatible OpenGL 3.3 core profile context (EGL only), where
+    the fixed-function calls of the legacy render path are errors.
+    """
+    if os.environ["PYOPENGL_PLATFORM"] == "osmesa":
+        from OpenGL import arrays, osmesa
+
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not context or not osmesa.OSMesaMakeCurrent(context, buffer, GL_UNSIGNED_BYTE, width, height):
+            raise RuntimeError("Failed to create an OSMesa context")
+        glViewport(0, 0, width, height)
+        return context, buffer
+
+    from OpenGL import EGL
+
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+        raise RuntimeError("Failed to initialize EGL")
+
+    config = EGL.EGLConfig()
+    count = EGL.EGLint()
+    attributes = (EGL.EGLint * 7)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                  EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                                  EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_NONE)
+    if not EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count)) or not count.value:
+        raise RuntimeError("No EGL config with OpenGL and a depth buffer")
+
+    surface = EGL.eglCreatePbufferSurface(display, config,
+                                          (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context_attributes = None
+    if core:
+        context_attributes = (EGL.EGLint * 9)(EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                                              EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK,
+                                              EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                                              EGL.EGL_CONTEXT_OPENGL_FORWARD_COMPATIBLE, EGL.EGL_TRUE, EGL.EGL_NONE)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attributes)
+    if context == EGL.EGL_NO_CONTEXT:
+        raise RuntimeError("Failed to create an EGL context" + (" with a 3.3 core profile" if core else ""))
+    if not EGL.eglMakeCurrent(display, surface, surface, context):
+        raise RuntimeError("Failed to make the EGL context current")
+    glViewport(0, 0, width, height)
+    return display, surface, context
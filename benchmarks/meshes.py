@@ -0,0 +1,37 @@
+"""Synthetic meshes of a requested size for the benchmarks."""
+import struct
+
+import numpy as np
+
+from Parsers.stl import FACET_DTYPE
+
+
+def grid_mesh(num_triangles):
+    """Indexed height-field mesh with roughly num_triangles faces: (vertices, faces)."""
+    n = max(1, int(np.sqrt(num_triangles / 2)))
+    x, y = np.meshgrid(np.arange(n + 1, dtype=np.float32), np.arange(n + 1, dtype=np.float32))
+    vertices = np.stack([x, y, np.sin(x * 0.1) * np.cos(y * 0.1)], axis=-1).reshape(-1, 3)
+
+    a = (np.arange(n)[:, None] * (n + 1) + np.arange(n)[None, :]).ravel()
+    b, c = a + 1, a + n + 1
+    d = c + 1
+    faces = np.concatenate([np.stack([a, b, c], axis=1), np.stack([b, d, c], axis=1)]).astype(np.int64)
+    return vertices, faces
+
+
+def grid_triangles(num_triangles):
+    """The grid mesh as an (n, 3, 3) float32 triangle soup, as read from an STL file."""
+    vertices, faces = grid_mesh(num_triangles)
+    return vertices[faces]
+
+
+def write_grid_stl(file_path, num_triangles):
+    """Write a binary STL of a triangulated height field with roughly num_triangles facets."""
+    triangles = grid_triangles(num_triangles)
+    facets = np.zeros(len(triangles), dtype=FACET_DTYPE)
+    facets['vertices'] = triangles
+    with open(file_path, 'wb') as f:
+        f.write(b'\0' * 80)
+        f.write(struct.pack('<I', len(facets)))
+        facets.tofile(f)
+    return len(facets)
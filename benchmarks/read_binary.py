@@ -0,0 +1,76 @@
+"""Compare STLParser.read_binary against the old per-triangle struct loop.
+
+Usage: python -m benchmarks.read_binary --triangles 1000000
+"""
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.meshes import write_grid_stl
+from Parsers.stl import STLParser
+
+
+def legacy_read_binary(file_path):
+    """The original read_binary loop, kept here as the reference timing."""
+    vertices = []
+    faces = []
+    vertex_map = {}
+    current_vertex_index = 0
+
+    with open(file_path, 'rb') as f:
+        f.seek(80)
+        num_triangles = struct.unpack('<I', f.read(4))[0]
+
+        for _ in range(num_triangles):
+            f.read(12)
+            vertex_indices = []
+            for _ in range(3):
+                vertex_data = struct.unpack('<fff', f.read(12))
+                vertex = tuple(vertex_data)
+                if vertex not in vertex_map:
+                    vertex_map[vertex] = current_vertex_index
+                    vertices.append(vertex)
+                    current_vertex_index += 1
+                vertex_indices.append(vertex_map[vertex])
+            faces.append(vertex_indices)
+            f.read(2)
+    return vertices, faces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary STL reader benchmark")
+    parser.add_argument("--triangles", type=int, default=1_000_000, help="Approximate facet count")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the vectorized reader")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".stl")
+    os.close(fd)
+    try:
+        count = write_grid_stl(path, args.triangles)
+        print(f"{count} facets, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        start = time.perf_counter()
+        stl = STLParser()
+        stl.read_binary(path)
+        vectorized = time.perf_counter() - start
+        print(f"read_binary: {vectorized:.3f} s ({len(stl.vertices)} vertices)")
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            vertices, faces = legacy_read_binary(path)
+            legacy = time.perf_counter() - start
+            print(f"legacy loop: {legacy:.3f} s ({len(vertices)} vertices)")
+            print(f"speedup: {legacy / vectorized:.1f}x")
+
+            assert np.array_equal(stl.vertices, np.array(vertices, dtype=np.float32))
+            assert np.array_equal(stl.faces, np.array(faces))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
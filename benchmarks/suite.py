@@ -0,0 +1,268 @@
+"""Benchmark suite for parsing, tessellation, subdivision and editing. Needs no GPU or display.
+
+Each case runs at several sizes (triangle counts). Time is the best of --repeat runs; peak memory is
+measured with tracemalloc in one extra run, so its overhead does not skew the timings.
+
+Usage:
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.25
+    python -m benchmarks.suite --cases read_binary split --sizes 1000 1000000 10000000
+
+With --compare the exit status is 1 if any case got slower or used more memory than the baseline
+by more than the threshold (a fraction: 0.25 means 25%).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.meshes import grid_mesh, write_grid_stl
+from geometry.decimate import decimate
+from Parsers.stl import STLParser
+from src.Logger import set_level
+from tesselation.cache import geometry_cache
+from tesselation.cube import Cube
+from tesselation.cylinder import Cylinder
+from tesselation.sphere import Sphere
+from tesselation.split import Split
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+DEFAULT_MAX_SIZE = 1_000_000
+
+# Timings shorter than this are too noisy to flag as regressions
+MIN_SECONDS = 1e-3
+MIN_PEAK_BYTES = 1 << 20
+
+
+@contextlib.contextmanager
+def stub_gl(module):
+    """Replace the gl* functions a module imported from OpenGL.GL with no-ops."""
+    originals = {name: value for name, value in vars(module).items() if name.startswith("gl") and callable(value)}
+    try:
+        for name in originals:
+            setattr(module, name, lambda *args, **kwargs: 0)
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(module, name, value)
+
+
+def render_system_with(num_triangles):
+    import src.Render as render
+
+    vertices, faces = grid_mesh(num_triangles)
+    with stub_gl(render):
+        render_system = render.GLRenderSystem([])
+        render_system.add_mesh(vertices, faces)
+    return render, render_system
+
+
+# Each case maps a size to a zero-argument callable, after doing any untimed setup in workdir
+
+def case_read_binary(size, workdir):
+    path = os.path.join(workdir, f"grid_{size}.stl")
+    if not os.path.exists(path):
+        write_grid_stl(path, size)
+    return lambda: STLParser().read_binary(path)
+
+
+def case_read_ascii(size, workdir):
+    path = os.path.join(workdir, f"grid_{size}.stla")
+    if not os.path.exists(path):
+        STLParser().write(path, *grid_mesh(size), stl_format='ascii')
+    return lambda: STLParser().read(path)
+
+
+def case_write_binary(size, workdir):
+    vertices, faces = grid_mesh(size)
+    path = os.path.join(workdir, "out.stl")
+    return lambda: STLParser().write(path, vertices, faces, stl_format='binary')
+
+
+def case_write_ascii(size, workdir):
+    vertices, faces = grid_mesh(size)
+    path = os.path.join(workdir, "out.stla")
+    return lambda: STLParser().write(path, vertices, faces, stl_format='ascii')
+
+
+def _tessellate(shape):
+    geometry_cache.clear()
+    return shape.tessellate()
+
+
+def case_sphere(size, workdir):
+    # 2 * N^2 triangles
+    sphere = Sphere(R=1.0, origin=[1, 2, 3], N=max(2, int(np.sqrt(size / 2))))
+    return lambda: _tessellate(sphere)
+
+
+def case_cylinder(size, workdir):
+    # 4 * sectors triangles
+    cylinder = Cylinder(radius=1.0, height=2.0, sectors=max(3, size // 4), origin=[1, 2, 3], filepath="")
+    return lambda: _tessellate(cylinder)
+
+
+def case_cube(size, workdir):
+    # A cube is always 12 triangles, so build a scene of size / 12 cubes; the unit cube is cached
+    cubes = [Cube(L=1.0, origin=[i, 0, 0], filepath="") for i in range(max(1, size // 12))]
+    return lambda: [cube.tessellate() for cube in cubes]
+
+
+def case_split(size, workdir):
+    # size is the output triangle count of one midpoint level
+    source = os.path.join(workdir, f"split_{size}.stl")
+    if not os.path.exists(source):
+        write_grid_stl(source, max(1, size // 4))
+    split = Split(source, os.path.join(workdir, "split_out.stl"), levels=1, scheme='midpoint')
+    return split.execute
+
+
+def case_decimate(size, workdir):
+    vertices, faces = grid_mesh(size)
+    return lambda: decimate(vertices, faces, target_faces=len(faces) // 4)
+
+
+DELETE_OPS = 10
+MOVE_OPS = 1000
+
+
+def case_delete_vertex(size, workdir):
+    render, render_system = render_system_with(size)
+    topology = render_system.shapes[0].topology
+    topology.build()
+    # Successive runs keep deleting further vertices from the middle of the mesh
+    next_vertex = [len(render_system.shapes[0].vertices) // 2]
+
+    def run():
+        for _ in range(DELETE_OPS):
+            next_vertex[0] = render_system.delete_vertex(0, next_vertex[0])
+
+    return run
+
+
+def case_move_vertex(size, workdir):
+    render, render_system = render_system_with(size)
+    count = len(render_system.shapes[0].vertices)
+    targets = np.random.default_rng(0).integers(0, count, MOVE_OPS)
+    position = np.array([0.5, 0.5, 0.5], dtype=np.float32)
+
+    def run():
+        for vertex_index in targets:
+            render_system.move_vertex(0, vertex_index, position)
+
+    return run
+
+
+CASES = {
+    "read_binary": case_read_binary,
+    "read_ascii": case_read_ascii,
+    "write_binary": case_write_binary,
+    "write_ascii": case_write_ascii,
+    "sphere": case_sphere,
+    "cylinder": case_cylinder,
+    "cube": case_cube,
+    "split": case_split,
+    "decimate": case_decimate,
+    "delete_vertex": case_delete_vertex,
+    "move_vertex": case_move_vertex,
+}
+
+# ASCII files are about 25x larger than binary ones, and decimation takes minutes at 1e7; keep them out of those runs
+MAX_SIZES = {"read_ascii": 1_000_000, "write_ascii": 1_000_000, "decimate": 1_000_000}
+
+
+def measure(run, repeat):
+    """Best wall time over repeat runs and the tracemalloc peak of one more run."""
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_suite(cases, sizes, repeat):
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="mesh_bench_")
+    try:
+        for name in cases:
+            for size in sizes:
+                if size > MAX_SIZES.get(name, size):
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run = CASES[name](size, workdir)
+                seconds, peak = measure(run, repeat)
+                results[f"{name}@{size}"] = {"seconds": seconds, "peak_bytes": peak}
+                print(f"{name:>14} {size:>10}: {seconds * 1000:10.2f} ms {peak / 2**20:10.1f} MiB peak")
+                del run
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print and return the cases that regressed against the baseline."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_bytes", MIN_PEAK_BYTES)):
+            if result[metric] > max(base[metric], floor) * (1 + threshold):
+                ratio = result[metric] / base[metric] if base[metric] else float("inf")
+                regressions.append(key)
+                print(f"REGRESSION {key} {metric}: {base[metric]:.6g} -> {result[metric]:.6g} ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="Cases to run")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help=f"Triangle counts (default: {', '.join(map(str, SIZES))} up to {DEFAULT_MAX_SIZE})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is kept")
+    parser.add_argument("--save", type=str, help="Write results to this JSON baseline")
+    parser.add_argument("--compare", type=str, help="Compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown or memory growth over the baseline, as a fraction")
+    args = parser.parse_args()
+
+    set_level("warning")
+    sizes = args.sizes or [size for size in SIZES if size <= DEFAULT_MAX_SIZE]
+    results = run_suite(args.cases, sizes, max(1, args.repeat))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({"python": platform.python_version(), "numpy": np.__version__,
+                       "machine": platform.machine(), "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import numpy as np
+
+# Triangles per leaf; NumPy does best with fewer, wider steps, so leaves are fairly large
+LEAF_SIZE = 16
+# Traversal starts from all nodes at this depth instead of the root
+START_DEPTH = 6
+# Leaves whose triangles are tested together when walking hit leaves front to back
+LEAF_BATCH = 8
+
+
+def _spread_bits(x):
+    """Insert two zero bits between each of the low 10 bits of x."""
+    x = x.astype(np.uint32) & 0x3FF
+    x = (x | (x << 16)) & 0x030000FF
+    x = (x | (x << 8)) & 0x0300F00F
+    x = (x | (x << 4)) & 0x030C30C3
+    x = (x | (x << 2)) & 0x09249249
+    return x
+
+
+def morton_codes(points):
+    """30-bit Morton codes of points quantized to a 1024^3 grid over their bounding box."""
+    lo = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lo, 1e-30)
+    cells = np.clip((points - lo) / extent * 1023, 0, 1023)
+    return (_spread_bits(cells[:, 0]) << 2) | (_spread_bits(cells[:, 1]) << 1) | _spread_bits(cells[:, 2])
+
+
+def ray_triangles(origin, direction, triangles, eps=1e-12):
+    """Möller–Trumbore test of one ray against (n, 3, 3) triangles. Returns t per triangle, inf on a miss."""
+    v0 = triangles[:, 0]
+    e1 = triangles[:, 1] - v0
+    e2 = triangles[:, 2] - v0
+    p = np.cross(direction, e2)
+    det = np.einsum('ij,ij->i', e1, p)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_det = 1.0 / det
+        s = origin - v0
+        u = np.einsum('ij,ij->i', s, p) * inv_det
+        q = np.cross(s, e1)
+        v = q @ direction * inv_det
+        t = np.einsum('ij,ij->i', e2, q) * inv_det
+        hit = (np.abs(det) > eps) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > eps)
+    return np.where(hit, t, np.inf)
+
+
+def ray_boxes(origin, inv_direction, lo, hi):
+    """Slab test of one ray against boxes. Returns the entry distance per box (clamped at 0) and the hit mask."""
+    t1 = (lo - origin) * inv_direction
+    t2 = (hi - origin) * inv_direction
+    t_near = np.maximum(np.minimum(t1, t2).max(axis=1), 0.0)
+    t_far = np.maximum(t1, t2).min(axis=1)
+    return t_near, (t_far >= t_near) & (t_near < np.inf)
+
+
+class BVH:
+    """Bounding volume hierarchy over the triangles of an indexed mesh, for ray picking.
+
+    Triangles are sorted along a Morton curve and cut into leaves of LEAF_SIZE. The tree is a
+    complete binary tree stored as an implicit heap (children of node i are 2i + 1 and 2i + 2),
+    so it is just two arrays of box corners. Traversal moves a whole frontier of nodes down
+    one level per step with array operations.
+
+    vertices and faces are referenced, not copied. After vertices move, pass the affected
+    faces to mark_dirty(); only their leaves and ancestors are refitted, on the next query.
+    """
+
+    def __init__(self, vertices, faces, leaf_size=LEAF_SIZE):
+        self.vertices = vertices
+        self.faces = faces
+        self.leaf_size = leaf_size
+        self.pending = []
+
+        count = len(faces)
+        used_leaves = max(1, -(-count // leaf_size))
+        self.depth = int(np.ceil(np.log2(used_leaves)))
+        self.leaf_count = 1 << self.depth
+        self.first_leaf = self.leaf_count - 1
+
+        # Triangle ids per leaf; a partial last leaf repeats its last triangle, empty leaves hold -1
+        order = np.argsort(morton_codes(vertices[faces].mean(axis=1)), kind='stable') if count else np.zeros(0, int)
+        slots = np.full(self.leaf_count * leaf_size, -1, dtype=np.int64)
+        slots[:count] = order
+        if count:
+            slots[count:used_leaves * leaf_size] = order[-1]
+        self.leaves = slots.reshape(self.leaf_count, leaf_size)
+        self.used_leaves = used_leaves if count else 0
+
+        self.leaf_of = np.empty(count, dtype=np.int64)
+        self.leaf_of[order] = np.arange(count) // leaf_size
+
+        node_count = 2 * self.leaf_count - 1
+        # Empty nodes get a box at +inf, which ray_boxes never reports as hit
+        self.lo = np.full((node_count, 3), np.inf, dtype=np.float32)
+        self.hi = np.full((node_count, 3), np.inf, dtype=np.float32)
+        self._fit_leaves(np.arange(self.used_leaves))
+        for level in range(self.depth - 1, -1, -1):
+            self._fit_nodes(np.arange((1 << level) - 1, (2 << level) - 1))
+
+    def _fit_leaves(self, leaves):
+        triangles = self.vertices[self.faces[self.leaves[leaves]]]  # (k, leaf_size, 3, 3)
+        nodes = self.first_leaf + leaves
+        self.lo[nodes] = triangles.min(axis=(1, 2))
+        self.hi[nodes] = triangles.max(axis=(1, 2))
+
+    def _fit_nodes(self, nodes):
+        left, right = 2 * nodes + 1, 2 * nodes + 2
+        self.lo[nodes] = np.minimum(self.lo[left], self.lo[right])
+        # +inf marks an empty child, so take the larger hi only over non-empty children
+        self.hi[nodes] = np.where(np.isinf(self.lo[right]), self.hi[left], np.maximum(self.hi[left], self.hi[right]))
+
+    def mark_dirty(self, faces):
+        """Schedule a refit of the leaves holding these faces."""
+        self.pending.append(np.asarray(faces, dtype=np.int64))
+
+    def refit(self):
+        """Refit the boxes of pending faces and their ancestors: O(k log n) for k faces."""
+        if not self.pending:
+            return
+        faces = np.concatenate(self.pending)
+        self.pending = []
+        if len(faces) == 0:
+            return
+        leaves = np.unique(self.leaf_of[faces])
+        self._fit_leaves(leaves)
+        nodes = leaves + self.first_leaf
+        for _ in range(self.depth):
+            nodes = np.unique((nodes - 1) // 2)
+            self._fit_nodes(nodes)
+
+    def intersect(self, origin, direction):
+        """Nearest face hit by the ray and its distance along direction: (face, t), or (-1, inf)."""
+        self.refit()
+        if self.used_leaves == 0:
+            return -1, np.inf
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        # A tiny stand-in for zero components keeps the slab test free of 0 * inf
+        inv_direction = 1.0 / np.where(np.abs(direction) < 1e-30, 1e-30, direction)
+
+        start = min(self.depth, START_DEPTH)
+        frontier = np.arange((1 << start) - 1, (2 << start) - 1)
+        for _ in range(self.depth - start):
+            _, hit = ray_boxes(origin, inv_direction, self.lo[frontier], self.hi[frontier])
+            frontier = frontier[hit]
+            frontier = np.concatenate((2 * frontier + 1, 2 * frontier + 2))
+
+        t_near, hit = ray_boxes(origin, inv_direction, self.lo[frontier], self.hi[frontier])
+        leaves, t_near = frontier[hit] - self.first_leaf, t_near[hit]
+        by_distance = np.argsort(t_near)
+        leaves, t_near = leaves[by_distance], t_near[by_distance]
+
+        # Test leaves front to back; stop once the best hit is closer than the next leaf's box
+        best_face, best_t = -1, np.inf
+        for start in range(0, len(leaves), LEAF_BATCH):
+            if t_near[start] >= best_t:
+                break
+            candidates = self.leaves[leaves[start:start + LEAF_BATCH]].ravel()
+            t = ray_triangles(origin, direction, self.vertices[self.faces[candidates]].astype(np.float64))
+            nearest = np.argmin(t)
+            if t[nearest] < best_t:
+                best_face, best_t = int(candidates[nearest]), float(t[nearest])
+        return best_face, best_t
@@ -0,0 +1,258 @@
+import numpy as np
+
+# Weight of the planes that hold boundary edges in place, relative to surface planes
+BOUNDARY_WEIGHT = 100.0
+# A collapse is rejected if it turns a face normal by more than about 78 degrees
+MIN_NORMAL_COS = 0.2
+# Fraction of the cheapest collapsible edges considered in one round
+ROUND_FRACTION = 0.25
+
+# Index of each 4x4 quadric entry in the 10 stored upper-triangle coefficients
+_ROWS, _COLS = np.triu_indices(4)
+_FULL = np.zeros((4, 4), dtype=np.int64)
+_FULL[_ROWS, _COLS] = np.arange(10)
+_FULL[_COLS, _ROWS] = np.arange(10)
+
+
+def plane_quadrics(planes, weights=None):
+    """Quadrics p p^T of (n, 4) planes (a, b, c, d), as the 10 upper-triangle coefficients."""
+    quadrics = planes[:, _ROWS] * planes[:, _COLS]
+    return quadrics if weights is None else quadrics * weights[:, None]
+
+
+def vertex_quadrics(vertices, faces):
+    """Sum of the quadrics of the planes of the faces around each vertex, plus boundary constraints."""
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals = normals / np.where(lengths > 0, lengths, 1.0)[:, None]
+    planes = np.column_stack([normals, -np.einsum('ij,ij->i', normals, triangles[:, 0])])
+    face_quadrics = plane_quadrics(planes)
+
+    quadrics = np.zeros((len(vertices), 10))
+    corners = faces.ravel()
+    for k in range(10):
+        quadrics[:, k] = np.bincount(corners, weights=np.repeat(face_quadrics[:, k], 3), minlength=len(vertices))
+
+    # Boundary edges get a plane through the edge, perpendicular to its face
+    edges, edge_faces, counts = _edges(faces, len(vertices))
+    boundary = counts == 1
+    if np.any(boundary):
+        a, b = edges[boundary, 0], edges[boundary, 1]
+        direction = vertices[b] - vertices[a]
+        normal = np.cross(direction, normals[edge_faces[boundary]])
+        length = np.linalg.norm(normal, axis=1)
+        normal = normal / np.where(length > 0, length, 1.0)[:, None]
+        planes = np.column_stack([normal, -np.einsum('ij,ij->i', normal, vertices[a])])
+        constraint = plane_quadrics(planes, np.full(len(planes), BOUNDARY_WEIGHT))
+        for k in range(10):
+            quadrics[:, k] += np.bincount(a, weights=constraint[:, k], minlength=len(vertices))
+            quadrics[:, k] += np.bincount(b, weights=constraint[:, k], minlength=len(vertices))
+    return quadrics
+
+
+def _edges(faces, vertex_count):
+    """Unique edges (lo, hi), one face holding each edge, and the number of faces per edge."""
+    pairs = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    pairs.sort(axis=1)
+    keys = pairs[:, 0] * vertex_count + pairs[:, 1]
+    keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    edges = np.column_stack([keys // vertex_count, keys % vertex_count])
+    return edges, first % len(faces), counts
+
+
+def collapse_targets(quadrics, vertices, edges):
+    """Position minimizing the summed quadric of each edge, and its error (a squared distance)."""
+    q = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+    full = q[:, _FULL]
+    a, b = full[:, :3, :3], full[:, :3, 3]
+
+    ends = vertices[edges]
+    candidates = np.stack([ends[:, 0], ends[:, 1], ends.mean(axis=1)], axis=1)
+    det = np.linalg.det(a)
+    scale = np.maximum(np.trace(a, axis1=1, axis2=2) / 3.0, 1e-30) ** 3
+    solvable = np.abs(det) > 1e-6 * scale
+    if np.any(solvable):
+        optimal = np.linalg.solve(a[solvable], -b[solvable][..., None])[..., 0]
+        # An optimum far off the edge usually means a badly conditioned system; fall back to the end points
+        length = np.linalg.norm(ends[solvable, 1] - ends[solvable, 0], axis=1)
+        near = np.linalg.norm(optimal - candidates[solvable, 2], axis=1) <= length
+        solvable[solvable] = near
+        optimal = optimal[near]
+
+    homogeneous = np.concatenate([candidates, np.ones(candidates.shape[:2] + (1,))], axis=2)
+    errors = np.einsum('eki,eij,ekj->ek', homogeneous, full, homogeneous)
+    best = np.argmin(errors, axis=1)
+    positions = candidates[np.arange(len(edges)), best]
+    costs = errors[np.arange(len(edges)), best]
+    if np.any(solvable):
+        h = np.column_stack([optimal, np.ones(len(optimal))])
+        optimal_costs = np.einsum('ei,eij,ej->e', h, full[solvable], h)
+        better = optimal_costs < costs[solvable]
+        rows = np.flatnonzero(solvable)[better]
+        positions[rows] = optimal[better]
+        costs[rows] = optimal_costs[better]
+    return positions, np.maximum(costs, 0.0)
+
+
+def _independent(edges, candidates, faces, vertex_count, rng):
+    """A near-maximal set of candidate edges of which no two touch a common face.
+
+    Such edges can all be collapsed at once. Picks edges whose random priority is lowest
+    among the candidates touching the faces around either end point, blocks their
+    neighbourhoods and repeats on what is left (Luby's algorithm).
+    """
+    chosen = []
+    none = len(candidates)
+    while len(candidates):
+        ranks = rng.permutation(len(candidates))
+        a, b = edges[candidates, 0], edges[candidates, 1]
+        vertex_min = np.full(vertex_count, none)
+        np.minimum.at(vertex_min, a, ranks)
+        np.minimum.at(vertex_min, b, ranks)
+        face_min = vertex_min[faces].min(axis=1)
+        region_min = np.full(vertex_count, none)
+        np.minimum.at(region_min, faces.ravel(), np.repeat(face_min, 3))
+        picked = (ranks == region_min[a]) & (ranks == region_min[b])
+        chosen.append(candidates[picked])
+
+        # Drop candidates with an end point on a face around a picked edge
+        ends = np.zeros(vertex_count, dtype=bool)
+        ends[a[picked]] = ends[b[picked]] = True
+        blocked = np.zeros(vertex_count, dtype=bool)
+        blocked[faces[ends[faces].any(axis=1)].ravel()] = True
+        candidates = candidates[~(blocked[a] | blocked[b])]
+    return np.concatenate(chosen) if chosen else np.zeros(0, dtype=np.int64)
+
+
+def _gather(offsets, rows):
+    """Positions of the CSR entries of rows, and which row each came from."""
+    starts, lengths = offsets[rows], offsets[rows + 1] - offsets[rows]
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    position = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+    return position, owner
+
+
+def _link_ok(edges, chosen, counts, vertex_count):
+    """Link condition: the ends of an edge share exactly as many neighbours as the edge has faces.
+
+    Collapsing an edge that fails it pinches the surface into a non-manifold shape.
+    """
+    both = np.concatenate([edges, edges[:, ::-1]])
+    order = np.argsort(both[:, 0], kind='stable')
+    neighbours = both[order, 1]
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(both[:, 0], minlength=vertex_count), out=offsets[1:])
+    keys = edges[:, 0] * vertex_count + edges[:, 1]
+
+    a, b = edges[chosen, 0], edges[chosen, 1]
+    position, owner = _gather(offsets, a)
+    other = neighbours[position]
+    lo, hi = np.minimum(other, b[owner]), np.maximum(other, b[owner])
+    query = lo * vertex_count + hi
+    found = np.searchsorted(keys, query)
+    shared = (found < len(keys)) & (keys[np.minimum(found, len(keys) - 1)] == query) & (other != b[owner])
+    common = np.bincount(owner[shared], minlength=len(a))
+    return common == counts[chosen]
+
+
+def _no_fold(vertices, faces, edges, chosen, positions):
+    """Reject collapses that flip or flatten any face that survives them."""
+    vertex_count = len(vertices)
+    edge_of = np.full(vertex_count, -1)
+    edge_of[edges[chosen, 0]] = chosen
+    edge_of[edges[chosen, 1]] = chosen
+    corner_edges = edge_of[faces]
+    affected = corner_edges.max(axis=1)
+    touched = affected >= 0
+    # Faces holding both ends of their edge disappear with it
+    collapsing = np.sum(corner_edges == affected[:, None], axis=1) >= 2
+    check = np.flatnonzero(touched & ~collapsing)
+
+    moved = vertices.copy()
+    moved[edges[chosen, 0]] = positions[chosen]
+    moved[edges[chosen, 1]] = positions[chosen]
+    before = vertices[faces[check]]
+    after = moved[faces[check]]
+    n_before = np.cross(before[:, 1] - before[:, 0], before[:, 2] - before[:, 0])
+    n_after = np.cross(after[:, 1] - after[:, 0], after[:, 2] - after[:, 0])
+    dot = np.einsum('ij,ij->i', n_before, n_after)
+    norms = np.linalg.norm(n_before, axis=1) * np.linalg.norm(n_after, axis=1)
+    bad = (dot <= MIN_NORMAL_COS * norms) & (np.linalg.norm(n_before, axis=1) > 0)
+
+    rejected = np.zeros(len(edges), dtype=bool)
+    rejected[affected[check[bad]]] = True
+    return ~rejected[chosen]
+
+
+def decimate(vertices, faces, target_faces=None, max_error=None):
+    """Reduce a mesh by quadric-error edge collapse (Garland and Heckbert).
+
+    Stops at target_faces faces, or when no edge can be collapsed within max_error (a distance
+    in mesh units), whichever comes first; at least one of them must be given.
+
+    The priority queue is processed in rounds: every round computes all collapse costs at
+    once, takes the cheapest ROUND_FRACTION of edges, and collapses as many of them as can
+    go together without touching a common face, cheapest first. Boundaries are held in place,
+    and collapses that would fold a face or break manifoldness are skipped.
+
+    Returns the new vertices and faces, with unused vertices removed.
+    """
+    if target_faces is None and max_error is None:
+        raise ValueError("decimate needs target_faces or max_error")
+    target_faces = 0 if target_faces is None else int(target_faces)
+    max_cost = np.inf if max_error is None else float(max_error) ** 2
+
+    vertices = np.asarray(vertices, dtype=np.float64).copy()
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    # Degenerate faces have no plane and would only block collapses around them
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+    vertex_count = len(vertices)
+    quadrics = vertex_quadrics(vertices, faces)
+    # Only breaks ties between neighbouring collapses; fixed so results are reproducible
+    rng = np.random.default_rng(0)
+    round_fraction = ROUND_FRACTION
+
+    while len(faces) > target_faces:
+        edges, _, counts = _edges(faces, vertex_count)
+        positions, costs = collapse_targets(quadrics, vertices, edges)
+
+        # An interior edge joining two boundary vertices would pinch the surface at its ends
+        on_boundary = np.zeros(vertex_count, dtype=bool)
+        on_boundary[edges[counts == 1].ravel()] = True
+        pinch = (counts == 2) & on_boundary[edges[:, 0]] & on_boundary[edges[:, 1]]
+        valid = np.flatnonzero((costs <= max_cost) & (counts <= 2) & ~pinch)
+        if len(valid) == 0:
+            break
+        # Each round only considers the cheapest part of the queue
+        by_cost = valid[np.argsort(costs[valid], kind='stable')]
+        candidates = by_cost[:max(1, int(len(by_cost) * round_fraction))]
+
+        chosen = _independent(edges, candidates, faces, vertex_count, rng)
+        chosen = chosen[_no_fold(vertices, faces, edges, chosen, positions)]
+        chosen = chosen[_link_ok(edges, chosen, counts, vertex_count)]
+        if len(chosen) == 0:
+            if len(candidates) == len(valid):
+                break
+            # Everything cheap was blocked; widen the next round to the whole queue
+            round_fraction = 1.0
+            continue
+
+        # Cheapest first, stopping once enough faces are gone
+        chosen = chosen[np.argsort(costs[chosen], kind='stable')]
+        removed = np.cumsum(counts[chosen])
+        chosen = chosen[:np.searchsorted(removed, len(faces) - target_faces) + 1]
+
+        keep, drop = edges[chosen, 0], edges[chosen, 1]
+        vertices[keep] = positions[chosen]
+        quadrics[keep] += quadrics[drop]
+        remap = np.arange(vertex_count)
+        remap[drop] = keep
+        faces = remap[faces]
+        faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+        round_fraction = ROUND_FRACTION
+
+    used = np.zeros(vertex_count, dtype=bool)
+    used[faces.ravel()] = True
+    renumber = np.cumsum(used) - 1
+    return vertices[used], renumber[faces]
@@ -0,0 +1,101 @@
+import numpy as np
+
+from geometry.topology import MeshTopology
+
+
+def triangle_normals(triangles):
+    """Unit normals of an (n, 3, 3) triangle array; degenerate triangles get a zero normal."""
+    triangles = np.asarray(triangles, dtype=np.float64)
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    return _normalize(normals)
+
+
+def face_normals(vertices, faces):
+    """Unit normals of all faces at once."""
+    return triangle_normals(np.asarray(vertices, dtype=np.float64)[faces])
+
+
+WEIGHTINGS = ("area", "angle")
+
+
+def corner_normals(triangles, weighting="area"):
+    """Weighted normal each (n, 3, 3) triangle contributes at each of its corners.
+
+    "area": the cross product of two edges, twice the face area long, the same at every corner.
+    "angle": the unit face normal times the corner angle, which does not depend on how the
+    surface around a vertex happens to be split into triangles.
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown normal weighting: {weighting}. Use one of {', '.join(WEIGHTINGS)}")
+    t = np.asarray(triangles, dtype=np.float64)
+    cross = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+    if weighting == "area":
+        return np.repeat(cross[:, None], 3, axis=1)
+    # Unit edge vectors 0->1, 1->2, 2->0; the angle at a corner is between its outgoing edge and
+    # the reversed incoming one
+    edges = _normalize(np.roll(t, -1, axis=1).reshape(-1, 3) - t.reshape(-1, 3)).reshape(-1, 3, 3)
+    cosines = -np.einsum('ijk,ijk->ij', edges, np.roll(edges, 1, axis=1))
+    angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+    return angles[:, :, None] * _normalize(cross)[:, None]
+
+
+def vertex_normals(vertices, faces, weighting="area"):
+    """Unit vertex normals: the sum of each adjacent face's corner_normals, scatter-added with bincount."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces).reshape(-1, 3)
+    return _normalize(_scatter(corner_normals(vertices[faces], weighting), faces.ravel(), len(vertices)))
+
+
+def _scatter(contributions, slots, count):
+    """Sum (n, 3, 3) corner contributions into count vectors by the slot of each corner."""
+    contributions = contributions.reshape(-1, 3)
+    sums = np.empty((count, 3))
+    for axis in range(3):
+        sums[:, axis] = np.bincount(slots, weights=contributions[:, axis], minlength=count)
+    return sums
+
+
+class MeshNormals:
+    """Face and vertex normals of an indexed mesh, kept up to date as vertices move.
+
+    vertices and faces are referenced, not copied; `topology` is a MeshTopology over the same
+    faces (one is built if not given). After vertices move, update() recomputes the normals of
+    the faces around them and the vertex normals of their one-ring only. Tombstoned faces of
+    the topology are (0, 0, 0) and contribute nothing.
+    """
+
+    def __init__(self, vertices, faces, weighting="area", topology=None):
+        self.vertices = vertices
+        self.faces = np.asarray(faces).reshape(-1, 3)
+        self.weighting = weighting
+        self.topology = topology if topology is not None else MeshTopology(self.faces, len(vertices))
+        self.face = face_normals(vertices, self.faces)
+        self.vertex = vertex_normals(vertices, self.faces, weighting).astype(np.float32)
+
+    def update(self, moved):
+        """Refresh normals after the given vertices moved. Returns the vertices whose normal changed."""
+        moved = np.unique(np.asarray(moved, dtype=np.int64))
+        _, faces = self.topology.faces_around(moved)
+        faces = np.unique(faces)
+        self.face[faces] = face_normals(self.vertices, self.faces[faces])
+        changed = np.union1d(moved, self.faces[faces].ravel())
+        self.refresh(changed)
+        return changed
+
+    def refresh(self, vertices):
+        """Recompute the normals of these sorted, unique vertices from all their live faces,
+        e.g. for the one-ring of a deleted vertex."""
+        owners, faces = self.topology.faces_around(vertices)
+        corners = self.faces[faces]
+        contributions = corner_normals(np.asarray(self.vertices, dtype=np.float64)[corners], self.weighting)
+        # Only the contribution at the owner's own corner counts
+        own = np.argmax(corners == vertices[owners][:, None], axis=1)
+        picked = contributions[np.arange(len(faces)), own]
+        sums = _scatter(picked, owners, len(vertices))
+        self.vertex[vertices] = _normalize(sums)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms != 0)
+    return vectors
@@ -0,0 +1,57 @@
+import numpy as np
+
+SCHEMES = ('bisect', 'midpoint')
+
+
+def edge_midpoints(vertices, edges):
+    """Add one midpoint per distinct undirected edge.
+
+    Edges shared by neighbouring faces get the same midpoint, so the mesh stays indexed, and
+    watertight when every face splits all its edges (midpoint). Returns the extended vertex array and the midpoint index of every edge.
+    """
+    edges = np.sort(edges, axis=1)
+    keys = edges[:, 0] * len(vertices) + edges[:, 1]
+    unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    distinct = edges[first]
+    midpoints = (vertices[distinct[:, 0]] + vertices[distinct[:, 1]]) / 2
+    return np.concatenate([vertices, midpoints.astype(vertices.dtype)]), len(vertices) + inverse.ravel()
+
+
+def bisect(vertices, faces):
+    """Split every face (v0, v1, v2) in two at the midpoint m of v0-v1: (v0, m, v2), (m, v1, v2).
+
+    Not conforming: the face across v0-v1 usually splits a different edge, leaving a T-junction
+    (open edges) at m. Use midpoint for watertight output.
+    """
+    v0, v1, v2 = faces[:, 0], faces[:, 1], faces[:, 2]
+    vertices, m = edge_midpoints(vertices, faces[:, :2])
+    new_faces = np.stack([np.stack([v0, m, v2], axis=1), np.stack([m, v1, v2], axis=1)], axis=1)
+    return vertices, new_faces.reshape(-1, 3)
+
+
+def midpoint(vertices, faces):
+    """Split every face in four through the midpoints of its edges."""
+    v0, v1, v2 = faces[:, 0], faces[:, 1], faces[:, 2]
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    vertices, m = edge_midpoints(vertices, edges)
+    m01, m12, m20 = m.reshape(3, -1)
+    new_faces = np.stack([
+        np.stack([v0, m01, m20], axis=1),
+        np.stack([m01, v1, m12], axis=1),
+        np.stack([m20, m12, v2], axis=1),
+        np.stack([m01, m12, m20], axis=1),
+    ], axis=1)
+    return vertices, new_faces.reshape(-1, 3)
+
+
+def subdivide(vertices, faces, levels=1, scheme='midpoint'):
+    """Apply a subdivision scheme ('midpoint' 1->4, watertight, or 'bisect' 1->2, which leaves
+    T-junctions) levels times to an indexed mesh."""
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown subdivision scheme: {scheme}. Use one of {', '.join(SCHEMES)}")
+    step = bisect if scheme == 'bisect' else midpoint
+    vertices = np.asarray(vertices)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    for _ in range(levels):
+        vertices, faces = step(vertices, faces)
+    return vertices, faces
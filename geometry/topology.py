@@ -0,0 +1,147 @@
+import numpy as np
+
+# Compact once this fraction of faces (or vertices) are tombstones
+COMPACT_RATIO = 0.25
+
+
+class MeshTopology:
+    """Vertex-to-face adjacency of an indexed triangle mesh, for interactive editing.
+
+    Adjacency is stored in CSR form: the faces around vertex v are
+    face_ids[offsets[v]:offsets[v + 1]]. It is built lazily with one argsort.
+
+    Deleting a vertex only tombstones it and its faces, so it costs O(degree). Dead faces
+    are overwritten with (0, 0, 0) in place, so `faces` can be the index buffer the renderer
+    draws: a degenerate triangle produces no fragments. Call compact() to drop tombstones
+    in bulk. needs_compaction() reports when the garbage ratio passes COMPACT_RATIO.
+    """
+
+    def __init__(self, faces, vertex_count):
+        # Kept as given (usually a view of the renderer's flat index array), so edits are shared
+        self.faces = faces
+        self.vertex_count = vertex_count
+        self.face_alive = np.ones(len(faces), dtype=bool)
+        self.vertex_alive = np.ones(vertex_count, dtype=bool)
+        self.dead_faces = 0
+        self.dead_vertices = 0
+        self.offsets = None
+        self.face_ids = None
+
+    def build(self):
+        """(Re)build the CSR adjacency from the current faces."""
+        corners = self.faces.reshape(-1).astype(np.int64)
+        self.face_ids = np.argsort(corners, kind='stable') // 3
+        self.offsets = np.zeros(self.vertex_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(corners, minlength=self.vertex_count), out=self.offsets[1:])
+
+    def _incident(self, vertex):
+        if self.offsets is None:
+            self.build()
+        return self.face_ids[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def vertex_faces(self, vertex):
+        """Live faces that use the vertex."""
+        faces = self._incident(vertex)
+        return faces[self.face_alive[faces]]
+
+    def faces_around(self, vertices):
+        """Live faces of many vertices at once: (owner, face) pairs, owner indexing into vertices."""
+        if self.offsets is None:
+            self.build()
+        starts, ends = self.offsets[vertices], self.offsets[np.asarray(vertices) + 1]
+        counts = ends - starts
+        owner = np.repeat(np.arange(len(counts)), counts)
+        faces = self.face_ids[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(len(owner))]
+        alive = self.face_alive[faces]
+        return owner[alive], faces[alive]
+
+    def one_ring(self, vertex):
+        """Sorted indices of the vertices sharing a live face with the vertex."""
+        ring = np.unique(self.faces[self.vertex_faces(vertex)])
+        return ring[ring != vertex]
+
+    def edge_faces(self, a, b):
+        """Live faces that contain the edge (a, b)."""
+        faces = self.vertex_faces(a)
+        return faces[np.any(self.faces[faces] == b, axis=1)]
+
+    def is_boundary_edge(self, a, b):
+        return len(self.edge_faces(a, b)) == 1
+
+    def is_boundary_vertex(self, vertex):
+        """True if any edge at the vertex has only one live face."""
+        faces = self.faces[self.vertex_faces(vertex)]
+        if len(faces) == 0:
+            return False
+        # Each face contributes the two edges that leave the vertex; interior edges appear twice
+        corner = np.argmax(faces == vertex, axis=1)
+        rows = np.arange(len(faces))
+        others = np.concatenate([faces[rows, (corner + 1) % 3], faces[rows, (corner + 2) % 3]])
+        _, counts = np.unique(others, return_counts=True)
+        return bool(np.any(counts == 1))
+
+    def is_alive(self, vertex):
+        return 0 <= vertex < self.vertex_count and bool(self.vertex_alive[vertex])
+
+    def next_alive(self, vertex, step=1):
+        """The first live vertex at or after vertex going forwards (step > 0) or backwards (step < 0),
+        wrapping around, or -1 if there is none."""
+        if self.vertex_count == 0:
+            return -1
+        vertex %= self.vertex_count
+        if not self.dead_vertices:
+            return vertex
+        alive = np.flatnonzero(self.vertex_alive)
+        if len(alive) == 0:
+            return -1
+        if step > 0:
+            slot = np.searchsorted(alive, vertex, side='left')
+            return int(alive[slot % len(alive)])
+        slot = np.searchsorted(alive, vertex, side='right') - 1
+        return int(alive[slot])  # -1 wraps to the last live vertex
+
+    def delete_vertex(self, vertex):
+        """Tombstone a vertex and its faces. Returns the removed face ids and their old rows."""
+        if not self.is_alive(vertex):
+            raise ValueError("Invalid vertex index")
+        removed = self.vertex_faces(vertex)
+        rows = self.faces[removed].copy()
+        self.faces[removed] = 0
+        self.face_alive[removed] = False
+        self.vertex_alive[vertex] = False
+        self.dead_faces += len(removed)
+        self.dead_vertices += 1
+        return removed, rows
+
+    def restore_vertex(self, vertex, removed, rows):
+        """Undo delete_vertex(vertex), given what it returned. Only valid before the next compact()."""
+        self.faces[removed] = rows
+        self.face_alive[removed] = True
+        self.vertex_alive[vertex] = True
+        self.dead_faces -= len(removed)
+        self.dead_vertices -= 1
+
+    def garbage_ratio(self):
+        return max(self.dead_faces / max(1, len(self.faces)), self.dead_vertices / max(1, self.vertex_count))
+
+    def needs_compaction(self):
+        return self.garbage_ratio() > COMPACT_RATIO
+
+    def compact(self):
+        """Drop dead faces and vertices and renumber.
+
+        Returns the old-to-new vertex map (-1 for removed vertices); apply it to any per-vertex
+        data with data[remap >= 0]. self.faces becomes a new array.
+        """
+        remap = np.full(self.vertex_count, -1, dtype=np.int64)
+        remap[self.vertex_alive] = np.arange(self.vertex_count - self.dead_vertices)
+        self.faces = remap[self.faces[self.face_alive]].astype(self.faces.dtype)
+
+        self.vertex_count -= self.dead_vertices
+        self.face_alive = np.ones(len(self.faces), dtype=bool)
+        self.vertex_alive = np.ones(self.vertex_count, dtype=bool)
+        self.dead_faces = 0
+        self.dead_vertices = 0
+        self.offsets = None
+        self.face_ids = None
+        return remap
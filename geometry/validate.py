@@ -0,0 +1,186 @@
+import numpy as np
+
+from geometry.weld import unique_rows
+
+
+def degenerate_faces(vertices, faces, area_eps=0.0):
+    """Mask of faces with a repeated vertex index or an area of at most area_eps."""
+    faces = np.asarray(faces).reshape(-1, 3)
+    repeated = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+    vertices = np.asarray(vertices, dtype=np.float64)
+    origin = vertices[faces[:, 0]]
+    u, v = vertices[faces[:, 1]] - origin, vertices[faces[:, 2]] - origin
+    # Squared length of the cross product is (2 * area) ** 2
+    doubled = np.square(u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1])
+    doubled += np.square(u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2])
+    doubled += np.square(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0])
+    return repeated | (doubled <= 4.0 * area_eps * area_eps)
+
+
+def duplicate_faces(faces):
+    """Mask of faces using the same three vertices as an earlier face, in either winding."""
+    faces = np.asarray(faces).reshape(-1, 3)
+    first, _ = unique_rows(np.sort(faces, axis=1).astype(np.int64))
+    duplicate = np.ones(len(faces), dtype=bool)
+    duplicate[first] = False
+    return duplicate
+
+
+class EdgeAnalysis:
+    """Undirected edges of a triangle mesh found by sorting edge keys, with their face pairs.
+
+    Every face contributes three half-edges (a, b); both directions of an edge share the key
+    min * n + max, so one sort groups the half-edges of each edge. An edge with one half-edge
+    is on a boundary (a hole), with more than two it is non-manifold, and with exactly two it
+    joins two faces, consistently wound if the half-edges run in opposite directions.
+    Half-edges of repeated-index corners (a == b) are skipped.
+    """
+
+    def __init__(self, faces, vertex_count):
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        a = faces.ravel()
+        b = faces[:, [1, 2, 0]].ravel()
+        half_edges = np.flatnonzero(a != b)
+        a, b = a[half_edges], b[half_edges]
+        keys = np.minimum(a, b) * vertex_count + np.maximum(a, b)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        counts = np.diff(np.append(starts, len(keys)))
+
+        self.face_count = len(faces)
+        self.edge_count = len(starts)
+        self.boundary = sorted_keys[starts[counts == 1]]
+        self.non_manifold = sorted_keys[starts[counts > 2]]
+        self.vertex_count = vertex_count
+        # Faces with a boundary or non-manifold edge
+        self.open_faces = np.zeros(len(faces), dtype=bool)
+        self.open_faces[half_edges[order[np.repeat(counts != 2, counts)]] // 3] = True
+
+        # The two faces of each manifold edge, and whether they wind the edge the same way
+        pairs = starts[counts == 2]
+        first, second = half_edges[order[pairs]], half_edges[order[pairs + 1]]
+        self.face_pairs = np.stack((first // 3, second // 3), axis=1)
+        forward = a < b
+        self.same_direction = forward[order[pairs]] == forward[order[pairs + 1]]
+
+    def edges(self, keys):
+        """(lo, hi) vertex pairs of edge keys."""
+        return np.stack((keys // self.vertex_count, keys % self.vertex_count), axis=1)
+
+    def components(self):
+        """Component label of every face, joining faces across manifold edges (minimum face id per component)."""
+        labels = np.arange(self.face_count)
+        u, v = self.face_pairs[:, 0], self.face_pairs[:, 1]
+        while True:
+            # Hook each root onto the smallest root it touches, then flatten the trees
+            low = np.minimum(labels[u], labels[v])
+            hooked = labels.copy()
+            np.minimum.at(hooked, labels[u], low)
+            np.minimum.at(hooked, labels[v], low)
+            while True:
+                jumped = hooked[hooked]
+                if np.array_equal(jumped, hooked):
+                    break
+                hooked = jumped
+            if np.array_equal(hooked, labels):
+                return labels
+            labels = hooked
+
+    def orientation(self):
+        """Faces to flip so every component is consistently wound, and the component labels.
+
+        A breadth-first search runs from the first face of every component at once, a whole
+        frontier per step: a neighbour across an edge both faces wind the same way gets the
+        opposite flip of the face it was reached from. Non-orientable components (a Möbius
+        strip) keep some inconsistent edges.
+        """
+        labels = self.components()
+        count = self.face_count
+        # Face adjacency in CSR form, both directions of every manifold edge
+        source = np.concatenate((self.face_pairs[:, 0], self.face_pairs[:, 1]))
+        target = np.concatenate((self.face_pairs[:, 1], self.face_pairs[:, 0]))
+        same = np.concatenate((self.same_direction, self.same_direction))
+        order = np.argsort(source, kind='stable')
+        target, same = target[order], same[order]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=count), out=offsets[1:])
+
+        flip = np.zeros(count, dtype=bool)
+        visited = labels == np.arange(count)
+        frontier = np.flatnonzero(visited)
+        while len(frontier):
+            starts, ends = offsets[frontier], offsets[frontier + 1]
+            sizes = ends - starts
+            slots = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+            parents = np.repeat(frontier, sizes)
+            neighbours = target[slots]
+            fresh = ~visited[neighbours]
+            neighbours, parents, flips = neighbours[fresh], parents[fresh], same[slots][fresh]
+            # A face reached from several parents at once takes the first
+            neighbours, first = np.unique(neighbours, return_index=True)
+            flip[neighbours] = flip[parents[first]] ^ flips[first]
+            visited[neighbours] = True
+            frontier = neighbours
+        return flip, labels
+
+
+def _signed_volumes(vertices, faces, labels):
+    """Signed volume enclosed by each component's faces (positive when wound outwards)."""
+    t = np.asarray(vertices, dtype=np.float64)[faces]
+    volume = np.einsum('ij,ij->i', t[:, 0], np.cross(t[:, 1], t[:, 2])) / 6.0
+    return np.bincount(labels, weights=volume, minlength=len(faces))
+
+
+def check(vertices, faces):
+    """Report of what is wrong with a mesh, as a JSON-serializable dict."""
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    degenerate = degenerate_faces(vertices, faces)
+    duplicate = duplicate_faces(faces)
+    analysis = EdgeAnalysis(faces[~degenerate], len(vertices))
+    labels = analysis.components()
+    used = np.zeros(len(vertices), dtype=bool)
+    used[faces.ravel()] = True
+    report = {
+        "vertices": len(vertices),
+        "faces": len(faces),
+        "edges": analysis.edge_count,
+        "degenerate_faces": int(degenerate.sum()),
+        "duplicate_faces": int(duplicate.sum()),
+        "boundary_edges": len(analysis.boundary),
+        "non_manifold_edges": len(analysis.non_manifold),
+        "inconsistent_edges": int(analysis.same_direction.sum()),
+        "components": int(np.count_nonzero(labels == np.arange(len(labels)))),
+        "unused_vertices": int(np.count_nonzero(~used)),
+    }
+    report["watertight"] = (report["boundary_edges"] == 0 and report["non_manifold_edges"] == 0
+                            and report["degenerate_faces"] == 0 and report["faces"] > 0)
+    report["consistent"] = report["inconsistent_edges"] == 0
+    return report
+
+
+def repair(vertices, faces):
+    """Drop degenerate and duplicate faces and wind every component consistently.
+
+    Closed components are turned outwards (positive signed volume). Returns the new faces and
+    counts of what was changed.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    degenerate = degenerate_faces(vertices, faces)
+    faces = faces[~degenerate]
+    duplicate = duplicate_faces(faces)
+    faces = faces[~duplicate]
+
+    analysis = EdgeAnalysis(faces, len(vertices))
+    flip, labels = analysis.orientation()
+    faces = np.where(flip[:, None], faces[:, [0, 2, 1]], faces)
+
+    # Components without boundary edges enclose a volume; turn the inside-out ones around
+    open_components = np.zeros(len(faces), dtype=bool)
+    open_components[labels[analysis.open_faces]] = True
+    inside_out = (_signed_volumes(vertices, faces, labels) < 0) & ~open_components
+    turned = inside_out[labels]
+    faces = np.where(turned[:, None], faces[:, [0, 2, 1]], faces)
+
+    return faces, {"removed_degenerate": int(degenerate.sum()), "removed_duplicate": int(duplicate.sum()),
+                   "flipped_faces": int(np.count_nonzero(flip ^ turned))}
@@ -0,0 +1,165 @@
+import numpy as np
+
+# Cells one step "forward" of a cell; together with the cell itself they cover all 26 neighbours
+# once a pair is checked from both sides' point of view
+_FORWARD_OFFSETS = np.array([(dx, dy, dz)
+                             for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                             if (dx, dy, dz) > (0, 0, 0)], dtype=np.int64)
+
+
+def _mix(rows):
+    """64-bit hash of rows of three 32- or 64-bit words."""
+    wide = rows.astype(np.uint64, copy=False)
+    return (wide[:, 0] * np.uint64(0x9E3779B97F4A7C15)) ^ (wide[:, 1] * np.uint64(0xC2B2AE3D27D4EB4F)) ^ wide[:, 2]
+
+
+def unique_rows(rows):
+    """Group identical rows of an (n, 3) integer array.
+
+    Returns the index of each group's first row, in order of first appearance, and the
+    group number of every row.
+    """
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Sort on a 64-bit mix of the rows; equal rows end up in adjacent runs. A hash collision
+    # between different rows would break a run apart, so fall back to an exact lexsort then.
+    key = _mix(rows)
+    order = np.argsort(key)
+    starts = np.empty(len(order), dtype=bool)
+    starts[0] = True
+    sorted_rows = np.take(rows, order, axis=0)
+    np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1, out=starts[1:])
+    sorted_key = key[order]
+    if np.any(starts[1:] & (sorted_key[1:] == sorted_key[:-1])):
+        order = np.lexsort((rows[:, 2], rows[:, 1], rows[:, 0]))
+        sorted_rows = np.take(rows, order, axis=0)
+        np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1, out=starts[1:])
+
+    # Renumber the runs so groups keep the order they first appear in
+    first = np.minimum.reduceat(order, np.flatnonzero(starts))
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(len(first))
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = rank[np.cumsum(starts) - 1]
+    return np.sort(first), inverse
+
+
+def weld(points, eps=0.0):
+    """Merge coincident points.
+
+    With eps == 0 only bit-identical points are merged (0.0 and -0.0 count as equal).
+    With eps > 0 every pair of points at most eps apart is merged, and merging is transitive:
+    a chain of points each within eps of the next becomes one vertex, however long it is.
+    Points further than eps from every point of another cluster are never merged into it.
+    Candidate pairs come from a uniform grid of cell size eps (a point's own and 26 neighbouring
+    cells). Merged points take the position of the first one in the input.
+
+    Returns (vertices, inverse, merged): the unique vertices in first-occurrence order, the
+    vertex index of every input point and the number of points that were merged away.
+    """
+    points = np.ascontiguousarray(np.asarray(points) + 0.0).reshape(-1, 3)
+    # Exact duplicates first: they are most of the corners of an STL file
+    first, inverse = unique_rows(points.view(np.uint32 if points.dtype == np.float32 else np.uint64))
+    if eps <= 0:
+        return points[first], inverse, len(points) - len(first)
+
+    unique_points = points[first]
+    if len(unique_points) and np.abs(unique_points).max() / eps >= 2.0 ** 62:
+        raise ValueError(f"Weld tolerance {eps} is too small for coordinates of this magnitude")
+    a, b = _close_pairs(unique_points, eps)
+    labels = _components(len(unique_points), a, b)
+
+    # Each cluster is labelled with its first point, so the roots are already in first-occurrence order
+    is_root = labels == np.arange(len(labels))
+    cluster = (np.cumsum(is_root) - 1)[labels]
+    return unique_points[is_root], cluster[inverse], len(points) - int(is_root.sum())
+
+
+def weld_mesh(vertices, faces, eps=0.0):
+    """Weld the vertices of an indexed mesh; returns (vertices, faces, merged)."""
+    vertices, inverse, merged = weld(vertices, eps)
+    return vertices, inverse[np.asarray(faces)], merged
+
+
+def _close_pairs(points, eps):
+    """Index pairs (a, b) of points at most eps apart, each pair once.
+
+    Points are bucketed on a grid of cell size eps, so a close pair lies in the same cell or in
+    neighbouring ones; every point of a cell is compared with every point of the cell itself and
+    of its forward neighbours.
+    """
+    cells = np.floor(points / eps).astype(np.int64)
+    cell_first, cell_of_point = unique_rows(cells)
+    occupied = cells[cell_first]
+    count = len(occupied)
+    # Points grouped by cell: those of cell c are order[starts[c]:starts[c] + sizes[c]]
+    order = np.argsort(cell_of_point, kind='stable')
+    sizes = np.bincount(cell_of_point, minlength=count)
+    starts = np.cumsum(sizes) - sizes
+
+    crowded = np.flatnonzero(sizes > 1)
+    cells_a, cells_b = [crowded], [crowded]
+    if count > 1:
+        # Linear cell keys when the grid is small enough, so a neighbour's key is a constant shift
+        # and the lookups below run over already sorted queries; hashed keys otherwise
+        low = occupied.min(axis=0) - 1
+        span = occupied.max(axis=0) - low + 2
+        packed = float(span[0]) * float(span[1]) * float(span[2]) < 2.0 ** 62
+        if packed:
+            strides = np.array([span[1] * span[2], span[2], 1], dtype=np.int64)
+            keys = (occupied - low) @ strides
+        else:
+            keys = _mix(occupied)
+        key_order = np.argsort(keys)
+        sorted_keys = keys[key_order]
+        sorted_cells = occupied[key_order]
+        for offset in _FORWARD_OFFSETS:
+            neighbours = sorted_cells + offset
+            if packed:
+                slot = np.searchsorted(sorted_keys, sorted_keys + offset @ strides)
+            else:
+                query = _mix(neighbours)
+                query_order = np.argsort(query)
+                slot = np.empty(count, dtype=np.int64)
+                slot[query_order] = np.searchsorted(sorted_keys, query[query_order])
+            slot = slot.clip(max=count - 1)
+            found = np.flatnonzero(np.all(sorted_cells[slot] == neighbours, axis=1))
+            cells_a.append(key_order[found])
+            cells_b.append(key_order[slot[found]])
+    same_cell = len(crowded)
+    cells_a = np.concatenate(cells_a)
+    cells_b = np.concatenate(cells_b)
+
+    # Every point of cell a against every point of cell b
+    pair_counts = sizes[cells_a] * sizes[cells_b]
+    total = int(pair_counts.sum())
+    rank = np.arange(total) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    width = np.repeat(sizes[cells_b], pair_counts)
+    a = order[np.repeat(starts[cells_a], pair_counts) + rank // width]
+    b = order[np.repeat(starts[cells_b], pair_counts) + rank % width]
+    # Within a cell, keep each unordered pair once
+    own = np.arange(total) < int(pair_counts[:same_cell].sum())
+    keep = ~own | (a < b)
+    a, b = a[keep], b[keep]
+    delta = points[a].astype(np.float64) - points[b]
+    close = np.einsum('ij,ij->i', delta, delta) <= eps * eps
+    return a[close], b[close]
+
+
+def _components(count, a, b):
+    """Label every point with the lowest point it is connected to through the pairs (a, b)."""
+    labels = np.arange(count)
+    if len(a) == 0:
+        return labels
+    # Label propagation with pointer jumping; chains of near-coincident points are short,
+    # so this settles in a few rounds
+    while True:
+        least = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, least)
+        np.minimum.at(updated, b, least)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
@@ -1,5 +1,10 @@
+import argparse
+import os
+
+from src.Logger import get_logger
 from src.Window import GLWindow
 from src.Render import GLRenderSystem
+from src.Snapshot import load_scene, save_scene
 
 from tesselation.cube import Cube
 from tesselation.cylinder import Cylinder
@@ -26,6 +31,28 @@ cylinder = Cylinder(
 )
 
 
-window = GLWindow()
-render_system = GLRenderSystem([cube])
+parser = argparse.ArgumentParser(description="Mesh Editor")
+parser.add_argument("--scene", type=str,
+                    help="Scene snapshot to start from if it exists, and to save the scene with its edits to on exit")
+args = parser.parse_args()
+log = get_logger("run")
+
+# Redraw only when input or a finished load changes something
+window = GLWindow(on_demand=True)
+render_system = GLRenderSystem([])
+if args.scene and os.path.exists(args.scene):
+    load_scene(render_system, args.scene)
+else:
+    # Shapes are tessellated on loader threads, so the window shows its first frame right away
+    for shape in [cube]:
+        position, shape.origin = shape.origin, [0, 0, 0]
+        render_system.add_shape_async(shape, position=position)
 window.run(render_system)
+
+if args.scene:
+    try:
+        os.makedirs(os.path.dirname(args.scene) or ".", exist_ok=True)
+        save_scene(render_system, args.scene)
+    except RuntimeError as e:
+        # Closed before every mesh had loaded; keep the previous snapshot rather than a partial scene
+        log.warning("Scene not saved: %s", e)
@@ -1,29 +1,178 @@
 import argparse
 
+from tesselation.check import Check, Repair
 from tesselation.cube import Cube
+from tesselation.cylinder import Cylinder
+from tesselation.decimate import Decimate
+from tesselation.merge import Merge
+from tesselation.pyramid import Pyramid
 from tesselation.split import Split
 from tesselation.sphere import Sphere
-from app import Application
+from tesselation.thumbnail import Thumbnail
+from app import Application, Batch, Thumbnails
 
 
 parser = argparse.ArgumentParser(description="Mesh Editor for Lab 0")
-parser.add_argument("command", choices=["Cube", "Sphere", "Split"], help="Command to execute")
+parser.add_argument("command", choices=["Cube", "Sphere", "Cylinder", "Pyramid", "Split", "Decimate", "Merge", "Batch",
+                                        "Thumbnail", "Thumbnails", "Check", "Repair"],
+                    help="Command to execute")
 parser.add_argument("--L", type=float, help="Side length for Cube")
-parser.add_argument("--R", type=float, help="Radius for Sphere")
+parser.add_argument("--R", type=float, help="Radius for Sphere and Cylinder")
 parser.add_argument("--N", type=int, default=4, help="Tessellation level for Sphere")
+parser.add_argument("--height", type=float, help="Height for Cylinder and Pyramid")
+parser.add_argument("--sectors", type=int, default=32, help="Number of segments for Cylinder")
+parser.add_argument("--base", type=float, help="Base size for Pyramid")
 parser.add_argument("--origin", type=lambda s: [float(x) for x in s.split(",")], help="Origin in format x,y,z")
 parser.add_argument("--filepath", type=str, help="Path to output STL file")
-parser.add_argument("--input", type=str, help="Input STL file for Split")
-args = parser.parse_args()
-
-app = Application()
-app.register_command("Cube", lambda **kwargs: Cube(kwargs["L"], kwargs["origin"], kwargs["filepath"]))
-app.register_command("Sphere", lambda **kwargs: Sphere(kwargs["R"], kwargs["origin"], kwargs["N"], kwargs["filepath"]))
-app.register_command("Split", lambda **kwargs: Split(kwargs["input"], kwargs["filepath"]))
-
-if args.command == "Cube":
-    app.execute("Cube", L=args.L, origin=args.origin, filepath=args.filepath)
-elif args.command == "Sphere":
-    app.execute("Sphere", R=args.R, origin=args.origin, N=args.N, filepath=args.filepath)
-elif args.command == "Split":
-    app.execute("Split", input=args.input, filepath=args.filepath)
+parser.add_argument("--input", type=str, help="Input STL file for Split, Decimate, Thumbnail, Check and Repair, "
+                                                "or directory of STL files for Thumbnails")
+parser.add_argument("--inputs", nargs="+", help="Input STL files for Merge")
+parser.add_argument("--offsets", nargs="+", type=lambda s: [float(x) for x in s.split(",")],
+                    help="Per-input origin offsets for Merge, one x,y,z per input")
+parser.add_argument("--snap", type=float,
+                    help="Round Merge output vertices to a grid of this size. Lossy: vertices move by up to half a "
+                         "cell, close points across a cell boundary stay apart, and collapsed facets are dropped")
+parser.add_argument("--weld", type=float, help="Weld vertices closer than this before Check and Repair")
+parser.add_argument("--output-dir", type=str, help="Directory for Thumbnails PNGs (default: the input directory)")
+parser.add_argument("--levels", type=int, default=1, help="Number of subdivision levels for Split")
+parser.add_argument("--scheme", choices=["midpoint", "bisect"], default="midpoint",
+                    help="Split scheme: midpoint splits each triangle in 4 and keeps the mesh watertight; "
+                         "bisect splits it in 2 but leaves T-junctions where neighbours split different edges")
+parser.add_argument("--target", type=int, help="Triangle count to decimate to")
+parser.add_argument("--ratio", type=float, help="Fraction of triangles to keep when decimating, e.g. 0.25")
+parser.add_argument("--max-error", type=float, help="Largest surface deviation allowed when decimating")
+parser.add_argument("--format", choices=["ascii", "binary"],
+                    help="Output STL format (default: by extension, .stla/.ast are ASCII, otherwise binary)")
+parser.add_argument("--size", type=int, default=256, help="Thumbnail width and height in pixels")
+parser.add_argument("--views", type=int, default=1, help="Turntable views side by side in each thumbnail")
+parser.add_argument("--mode", choices=["FILLED", "WIREFRAME", "ALL"], default="FILLED", help="Thumbnail render mode")
+parser.add_argument("--supersample", type=int, default=1,
+                    help="Render thumbnails this many times larger and scale down, for antialiasing")
+parser.add_argument("--manifest", type=str, help="JSON-lines or CSV file of jobs for Batch")
+parser.add_argument("--workers", type=int, help="Worker processes for Batch and Thumbnails (default: CPU count)")
+parser.add_argument("--chunksize", type=int, default=1, help="Jobs handed to a worker at a time for Batch and Thumbnails")
+parser.add_argument("--report", type=str, help="Write per-job Batch or Thumbnails results to this JSON-lines file, "
+                                               "or the Check or Repair report to this JSON file")
+
+
+def _origin(kwargs):
+    return kwargs.get("origin") or [0.0, 0.0, 0.0]
+
+
+# Command factories live at module level so Batch can pickle them into worker processes
+def make_cube(**kwargs):
+    return Cube(kwargs["L"], _origin(kwargs), kwargs["filepath"], kwargs.get("stl_format"))
+
+
+def make_sphere(**kwargs):
+    return Sphere(kwargs["R"], _origin(kwargs), kwargs.get("N", 4), kwargs["filepath"], kwargs.get("stl_format"))
+
+
+def make_cylinder(**kwargs):
+    return Cylinder(kwargs["R"], kwargs["height"], kwargs.get("sectors", 32), _origin(kwargs),
+                    kwargs["filepath"], kwargs.get("stl_format"))
+
+
+def make_pyramid(**kwargs):
+    return Pyramid(kwargs["base"], kwargs["height"], _origin(kwargs), kwargs["filepath"], kwargs.get("stl_format"))
+
+
+def make_split(**kwargs):
+    return Split(kwargs["input"], kwargs["filepath"], kwargs.get("stl_format"),
+                 kwargs.get("levels", 1), kwargs.get("scheme", "midpoint"))
+
+
+def make_decimate(**kwargs):
+    return Decimate(kwargs["input"], kwargs["filepath"], kwargs.get("stl_format"),
+                    kwargs.get("target"), kwargs.get("ratio"), kwargs.get("max_error"))
+
+
+def make_merge(**kwargs):
+    return Merge(kwargs["inputs"], kwargs["filepath"], kwargs.get("stl_format"), kwargs.get("offsets"),
+                 kwargs.get("snap"))
+
+
+def make_check(**kwargs):
+    return Check(kwargs["input"], kwargs.get("report"), kwargs.get("weld"))
+
+
+def make_repair(**kwargs):
+    return Repair(kwargs["input"], kwargs["filepath"], kwargs.get("stl_format"), kwargs.get("report"),
+                  kwargs.get("weld"))
+
+
+def make_thumbnail(**kwargs):
+    return Thumbnail(kwargs["input"], kwargs["filepath"], kwargs.get("size", 256), kwargs.get("views", 1),
+                     kwargs.get("mode", "FILLED"), supersample=kwargs.get("supersample", 1))
+
+
+def make_thumbnails(**kwargs):
+    return Thumbnails(build_application(), kwargs["input"], kwargs.get("output_dir"), kwargs.get("size", 256),
+                      kwargs.get("views", 1), kwargs.get("mode", "FILLED"), kwargs.get("supersample", 1),
+                      kwargs.get("workers"), kwargs.get("chunksize", 1), kwargs.get("report"))
+
+
+def make_batch(**kwargs):
+    return Batch(build_application(), kwargs["manifest"], kwargs.get("workers"),
+                 kwargs.get("chunksize", 1), kwargs.get("report"))
+
+
+def build_application():
+    app = Application()
+    app.register_command("Cube", make_cube)
+    app.register_command("Sphere", make_sphere)
+    app.register_command("Cylinder", make_cylinder)
+    app.register_command("Pyramid", make_pyramid)
+    app.register_command("Split", make_split)
+    app.register_command("Decimate", make_decimate)
+    app.register_command("Merge", make_merge)
+    app.register_command("Batch", make_batch)
+    app.register_command("Thumbnail", make_thumbnail)
+    app.register_command("Thumbnails", make_thumbnails)
+    app.register_command("Check", make_check)
+    app.register_command("Repair", make_repair)
+    return app
+
+
+def main():
+    args = parser.parse_args()
+    app = build_application()
+
+    if args.command == "Cube":
+        app.execute("Cube", L=args.L, origin=args.origin, filepath=args.filepath, stl_format=args.format)
+    elif args.command == "Sphere":
+        app.execute("Sphere", R=args.R, origin=args.origin, N=args.N, filepath=args.filepath, stl_format=args.format)
+    elif args.command == "Cylinder":
+        app.execute("Cylinder", R=args.R, height=args.height, sectors=args.sectors, origin=args.origin,
+                    filepath=args.filepath, stl_format=args.format)
+    elif args.command == "Pyramid":
+        app.execute("Pyramid", base=args.base, height=args.height, origin=args.origin,
+                    filepath=args.filepath, stl_format=args.format)
+    elif args.command == "Split":
+        app.execute("Split", input=args.input, filepath=args.filepath, stl_format=args.format,
+                    levels=args.levels, scheme=args.scheme)
+    elif args.command == "Decimate":
+        app.execute("Decimate", input=args.input, filepath=args.filepath, stl_format=args.format,
+                    target=args.target, ratio=args.ratio, max_error=args.max_error)
+    elif args.command == "Merge":
+        app.execute("Merge", inputs=args.inputs, filepath=args.filepath, stl_format=args.format,
+                    offsets=args.offsets, snap=args.snap)
+    elif args.command == "Batch":
+        app.execute("Batch", manifest=args.manifest, workers=args.workers, chunksize=args.chunksize,
+                    report=args.report)
+    elif args.command == "Thumbnail":
+        app.execute("Thumbnail", input=args.input, filepath=args.filepath, size=args.size, views=args.views,
+                    mode=args.mode, supersample=args.supersample)
+    elif args.command == "Thumbnails":
+        app.execute("Thumbnails", input=args.input, output_dir=args.output_dir, size=args.size, views=args.views,
+                    mode=args.mode, supersample=args.supersample, workers=args.workers,
+                    chunksize=args.chunksize, report=args.report)
+    elif args.command == "Check":
+        app.execute("Check", input=args.input, report=args.report, weld=args.weld)
+    elif args.command == "Repair":
+        app.execute("Repair", input=args.input, filepath=args.filepath, stl_format=args.format,
+                    report=args.report, weld=args.weld)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# --- History.py ---
+from collections import deque
+
+# Undo entries are dropped oldest first past this many bytes
+HISTORY_MAX_BYTES = 64 << 20
+# Rough Python object overhead of one entry, on top of its arrays
+ENTRY_OVERHEAD = 200
+
+
+class VertexMove:
+    """A vertex moved from old to new; a drag of the same vertex merges into one entry."""
+
+    def __init__(self, shape, vertex, old, new):
+        self.shape = shape
+        self.vertex = vertex
+        self.old = old
+        self.new = new
+        self.nbytes = ENTRY_OVERHEAD + old.nbytes + new.nbytes
+
+    def merge(self, other):
+        if not (isinstance(other, VertexMove) and other.shape == self.shape and other.vertex == self.vertex):
+            return False
+        self.new = other.new
+        return True
+
+    def undo(self, render_system):
+        render_system.move_vertex(self.shape, self.vertex, self.old, record=False)
+
+    def redo(self, render_system):
+        render_system.move_vertex(self.shape, self.vertex, self.new, record=False)
+
+    def __str__(self):
+        return f"move of vertex {self.vertex} on shape {self.shape}"
+
+
+class VertexDelete:
+    """A tombstoned vertex with the ids and old rows of the faces removed with it."""
+
+    def __init__(self, shape, vertex, removed, rows):
+        self.shape = shape
+        self.vertex = vertex
+        self.removed = removed
+        self.rows = rows
+        self.nbytes = ENTRY_OVERHEAD + removed.nbytes + rows.nbytes
+
+    def merge(self, other):
+        return False
+
+    def undo(self, render_system):
+        render_system.restore_vertex(self.shape, self.vertex, self.removed, self.rows)
+
+    def redo(self, render_system):
+        render_system.delete_vertex(self.shape, self.vertex, record=False)
+
+    def __str__(self):
+        return f"deletion of vertex {self.vertex} on shape {self.shape}"
+
+
+class ShapeTransform:
+    """A shape moved and/or rotated; a drag of the same shape merges into one entry."""
+
+    def __init__(self, shape, old_position, old_rotation, new_position, new_rotation):
+        self.shape = shape
+        self.old = (list(old_position), list(old_rotation))
+        self.new = (list(new_position), list(new_rotation))
+        self.nbytes = ENTRY_OVERHEAD
+
+    def merge(self, other):
+        if not (isinstance(other, ShapeTransform) and other.shape == self.shape):
+            return False
+        self.new = other.new
+        return True
+
+    def apply(self, render_system, transform):
+        shape = render_system.shapes[self.shape]
+        # In place: LOD levels share these lists
+        shape.position[:], shape.rotation[:] = transform
+
+    def undo(self, render_system):
+        self.apply(render_system, self.old)
+
+    def redo(self, render_system):
+        self.apply(render_system, self.new)
+
+    def __str__(self):
+        return f"transform of shape {self.shape}"
+
+
+class EditHistory:
+    """Undo/redo journal of edits, stored as small deltas rather than copies of the mesh.
+
+    Entries recorded while the history is open (between seal() calls, e.g. during one mouse
+    drag) merge into the previous entry when they have the same target. Past max_bytes the
+    oldest entries are dropped. Recording a new edit clears the redo stack.
+    """
+
+    def __init__(self, max_bytes=HISTORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.nbytes = 0
+        self.open = False
+        # Bumped by clear(), so an undo/redo that caused a clear does not push a stale entry
+        self.generation = 0
+
+    def record(self, entry):
+        self.drop(self.redo_stack)
+        if self.open and self.undo_stack and self.undo_stack[-1].merge(entry):
+            return
+        self.undo_stack.append(entry)
+        self.nbytes += entry.nbytes
+        self.open = True
+        while self.nbytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.nbytes -= self.undo_stack.popleft().nbytes
+
+    def seal(self):
+        """End the current drag: the next entry starts fresh instead of merging."""
+        self.open = False
+
+    def drop(self, entries):
+        self.nbytes -= sum(entry.nbytes for entry in entries)
+        entries.clear()
+
+    def undo(self, render_system):
+        return self._step(render_system, self.undo_stack, self.redo_stack, "undo")
+
+    def redo(self, render_system):
+        return self._step(render_system, self.redo_stack, self.undo_stack, "redo")
+
+    def _step(self, render_system, source, target, action):
+        self.seal()
+        if not source:
+            return None
+        entry = source.pop()
+        generation = self.generation
+        getattr(entry, action)(render_system)
+        if self.generation == generation:
+            target.append(entry)
+        else:
+            self.nbytes -= entry.nbytes
+        return entry
+
+    def clear(self):
+        """Forget all entries; returns True if there were any."""
+        had_entries = bool(self.undo_stack or self.redo_stack)
+        self.drop(self.undo_stack)
+        self.drop(self.redo_stack)
+        self.open = False
+        self.generation += 1
+        return had_entries
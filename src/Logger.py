@@ -0,0 +1,60 @@
+import logging
+import os
+import time
+
+LOG_LEVEL_ENV = "MESH_EDITOR_LOG"  # e.g. MESH_EDITOR_LOG=debug to see per-event messages
+ROOT_LOGGER = "mesh_editor"
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets a message through at most once per interval; later ones are counted and dropped.
+
+    Messages are told apart by their format string, so "Moved vertex %d" with different
+    arguments counts as one message. The next message that passes reports how many were dropped.
+    """
+
+    def __init__(self, interval):
+        super().__init__()
+        self.interval = interval
+        self.last_emit = {}
+        self.suppressed = {}
+
+    def filter(self, record):
+        now = time.monotonic()
+        key = record.msg
+        if now - self.last_emit.get(key, -self.interval) < self.interval:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False
+        self.last_emit[key] = now
+        dropped = self.suppressed.pop(key, 0)
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+        return True
+
+
+def _configure_root():
+    root = logging.getLogger(ROOT_LOGGER)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root.addHandler(handler)
+        root.setLevel(os.environ.get(LOG_LEVEL_ENV, "INFO").upper())
+        root.propagate = False
+    return root
+
+
+def get_logger(name, rate_limit=None):
+    """Logger under the editor's root logger, optionally limited to one message per rate_limit seconds.
+
+    Use %-style arguments (log.debug("Moved %s", pos)) so messages below the level are never formatted.
+    """
+    _configure_root()
+    logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+    if rate_limit is not None and not any(isinstance(f, RateLimitFilter) for f in logger.filters):
+        logger.addFilter(RateLimitFilter(rate_limit))
+    return logger
+
+
+def set_level(level):
+    """Set the level of all editor logging, as a name ("debug", "warning") or a logging constant."""
+    _configure_root().setLevel(level.upper() if isinstance(level, str) else level)
@@ -1,5 +1,9 @@
 from enum import Enum, auto
 
+from src.Logger import get_logger
+
+log = get_logger("controls")
+
 
 class ControlMode(Enum):
     CAMERA = auto()
@@ -7,6 +11,13 @@ class ControlMode(Enum):
     TRIANGLE = auto()
 
 
+# Kept out of Render.py so the software renderer can use it without importing OpenGL
+class RenderMode(Enum):
+    ALL = 0
+    FILLED = 1
+    WIREFRAME = 2
+
+
 class ModeController:
     def __init__(self):
         self.mode = ControlMode.CAMERA
@@ -21,33 +32,33 @@ class ModeController:
             self.mode = ControlMode.TRIANGLE
         else:
             self.mode = ControlMode.CAMERA
-        print(f"Switched to: {self.mode.name}")
+        log.info("Switched to: %s", self.mode.name)
 
     def select_next_shape(self, shape_count):
         if shape_count == 0:
             return
         self.selected_shape_index = (self.selected_shape_index + 1) % shape_count
         self.selected_triangle_index = 0  # Reset triangle index when switching shapes
-        print(f"Selected shape index: {self.selected_shape_index}")
+        log.info("Selected shape index: %d", self.selected_shape_index)
 
     def select_previous_shape(self, shape_count):
         if shape_count == 0:
             return
         self.selected_shape_index = (self.selected_shape_index - 1) % shape_count
         self.selected_triangle_index = 0  # Reset triangle index when switching shapes
-        print(f"Selected shape index: {self.selected_shape_index}")
+        log.info("Selected shape index: %d", self.selected_shape_index)
 
     def select_next_triangle(self, triangle_count):
         if triangle_count == 0:
             return
         self.selected_triangle_index = (self.selected_triangle_index + 1) % triangle_count
-        print(f"Selected triangle index: {self.selected_triangle_index}")
+        log.info("Selected triangle index: %d", self.selected_triangle_index)
 
     def select_previous_triangle(self, triangle_count):
         if triangle_count == 0:
             return
         self.selected_triangle_index = (self.selected_triangle_index - 1) % triangle_count
-        print(f"Selected triangle index: {self.selected_triangle_index}")
+        log.info("Selected triangle index: %d", self.selected_triangle_index)
 
     def select_next_vertex(self, vertex_count):
         self.selected_vertex_index = (self.selected_vertex_index + 1) % max(1, vertex_count)
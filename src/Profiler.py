@@ -0,0 +1,128 @@
+import json
+import sys
+import time
+
+import numpy as np
+
+SECTIONS = ("render", "swap", "poll")
+
+FRAME_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("render", np.float64),
+    ("swap", np.float64),
+    ("poll", np.float64),
+    ("total", np.float64),
+    ("draw_calls", np.int64),
+    ("triangles", np.int64),
+    ("drawn", np.int64),
+    ("culled", np.int64),
+])
+
+
+class FrameProfiler:
+    """Per-frame timings (render/swap/poll) and draw statistics in a fixed-size ring buffer.
+
+    Usage in a frame loop:
+        profiler.begin_frame()
+        render(); profiler.mark("render")
+        swap();   profiler.mark("swap")
+        poll();   profiler.mark("poll")
+        profiler.end_frame(render_system.draw_stats)
+
+    hud is None, "terminal" (a summary line on stderr) or "title" (the summary is kept in
+    hud_text for the window to show). trace_path, if given, gets one JSON line per frame.
+    """
+
+    def __init__(self, capacity=600, hud=None, hud_interval=0.5, trace_path=None):
+        self.frames = np.zeros(capacity, dtype=FRAME_DTYPE)
+        self.capacity = capacity
+        self.count = 0
+        self.hud = hud
+        self.hud_interval = hud_interval
+        self.hud_text = ""
+        self.last_hud = 0.0
+        self.shape_stats = []  # (draw calls, triangles) per shape in the latest frame
+
+        self.trace_path = trace_path
+        self.trace = open(trace_path, 'w') if trace_path else None
+
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.current = np.zeros(1, dtype=FRAME_DTYPE)[0]
+
+    def begin_frame(self):
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def mark(self, section):
+        """Attribute the time since the previous mark (or begin_frame) to section."""
+        now = time.perf_counter()
+        self.current[section] = now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self, shape_stats=()):
+        row = self.current
+        row["frame"] = self.count
+        row["total"] = self.last_mark - self.frame_start
+        self.shape_stats = shape_stats
+        row["draw_calls"] = sum(calls for calls, _ in shape_stats)
+        row["triangles"] = sum(triangles for _, triangles in shape_stats)
+        # Shapes without a draw call this frame were culled
+        row["drawn"] = sum(1 for calls, _ in shape_stats if calls)
+        row["culled"] = len(shape_stats) - row["drawn"]
+        self.frames[self.count % self.capacity] = row
+        self.count += 1
+
+        if self.trace is not None:
+            record = {name: row[name].item() for name in FRAME_DTYPE.names}
+            record["shapes"] = [list(stats) for stats in shape_stats]
+            self.trace.write(json.dumps(record) + "\n")
+
+        if self.hud is not None and self.last_mark - self.last_hud >= self.hud_interval:
+            self.last_hud = self.last_mark
+            self.hud_text = self.format_summary()
+            if self.hud == "terminal":
+                sys.stderr.write("\r" + self.hud_text)
+                sys.stderr.flush()
+
+        for section in SECTIONS:
+            row[section] = 0.0
+
+    def recent(self):
+        """Recorded frames, oldest first."""
+        if self.count <= self.capacity:
+            return self.frames[:self.count]
+        start = self.count % self.capacity
+        return np.concatenate((self.frames[start:], self.frames[:start]))
+
+    def summary(self):
+        """Mean, median, 95th percentile and max time in ms of each section over the buffered frames."""
+        frames = self.recent()
+        if len(frames) == 0:
+            return {}
+        result = {}
+        for section in SECTIONS + ("total",):
+            times = frames[section] * 1000.0
+            result[section] = {"mean": float(times.mean()), "p50": float(np.percentile(times, 50)),
+                               "p95": float(np.percentile(times, 95)), "max": float(times.max())}
+        result["fps"] = 1000.0 / result["total"]["mean"] if result["total"]["mean"] > 0 else 0.0
+        result["draw_calls"] = int(frames["draw_calls"][-1])
+        result["triangles"] = int(frames["triangles"][-1])
+        result["drawn"] = int(frames["drawn"][-1])
+        result["culled"] = int(frames["culled"][-1])
+        return result
+
+    def format_summary(self):
+        stats = self.summary()
+        if not stats:
+            return ""
+        return (f"{stats['fps']:6.1f} fps | frame {stats['total']['mean']:6.2f} ms (p95 {stats['total']['p95']:6.2f}) | "
+                f"render {stats['render']['mean']:6.2f} swap {stats['swap']['mean']:6.2f} "
+                f"poll {stats['poll']['mean']:6.2f} ms | {stats['draw_calls']} draws, {stats['triangles']} tris, "
+                f"{stats['drawn']} shapes drawn, {stats['culled']} culled")
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+        if self.hud == "terminal" and self.hud_text:
+            sys.stderr.write("\n")
@@ -0,0 +1,257 @@
+# --- Raster.py ---
+import struct
+import zlib
+
+import glm
+import numpy as np
+
+from src.Camera import Camera
+from src.Mode_Controller import RenderMode
+
+from geometry.normals import vertex_normals
+
+# Same colours and lighting as the OpenGL path
+BACKGROUND = (0.2, 0.3, 0.3)
+FILL_COLOR = (0.5, 0.5, 0.5)
+LINE_COLOR = (0.5, 0.0, 0.0)
+AMBIENT = 0.1
+
+# Pixels per tile side; triangles are binned per tile and fragments generated tile by tile
+TILE_SIZE = 32
+# Fragments tested per step, bounding the size of the temporary arrays
+FRAGMENT_BATCH = 1 << 20
+# Lines pass the depth test this far (in NDC depth) behind the surface, like glPolygonOffset.
+# frame() fits near and far to the mesh, so this is a small fraction of its depth
+LINE_DEPTH_BIAS = 1e-2
+
+
+def write_png(filepath, image):
+    """Write an (h, w, 3) uint8 image as an RGB PNG, with zlib and struct only."""
+    height, width, _ = image.shape
+    # Every scanline starts with filter type 0 (none)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(filepath, 'wb') as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def _matrix(m):
+    """A glm matrix as a row-major NumPy array (glm lists columns)."""
+    return np.array(m.to_list(), dtype=np.float64).T
+
+
+class SoftwareRenderer:
+    """Offscreen renderer for machines without a display or GPU.
+
+    Draws indexed meshes into a NumPy colour and depth buffer with the camera model and
+    render modes of GLRenderSystem: a 60 degree perspective camera, Lambert shading lit from
+    the eye, and filled, wireframe or both. Lighting is computed per vertex and interpolated.
+
+    Rasterization is tiled: each triangle is binned into the TILE_SIZE tiles its bounding box
+    touches, and every (triangle, tile) pair yields the pixels of the box inside that tile.
+    Those fragments are tested in large array batches against the z-buffer, so the Python
+    loop runs once per batch, not per triangle or pixel.
+    """
+
+    def __init__(self, width=256, height=256, render_mode=RenderMode.FILLED, supersample=1):
+        self.width = width
+        self.height = height
+        self.render_mode = render_mode
+        # Render this many times larger in each direction and average down, for antialiasing
+        self.supersample = supersample
+        self.camera = Camera()
+        self.fov = 60.0
+        self.near = 0.1
+        self.far = 100.0
+
+    def render(self, vertices, faces, normals=None):
+        """Draw one mesh and return the image as an (height, width, 3) uint8 array."""
+        scale = self.supersample
+        width, height = self.width * scale, self.height * scale
+        self.color = np.empty((height * width, 3), dtype=np.float32)
+        self.color[:] = BACKGROUND
+        self.depth = np.full(height * width, np.inf)
+
+        vertices = np.asarray(vertices, dtype=np.float64)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        if len(faces):
+            screen, front = self.project(vertices, width, height)
+            # Triangles with a corner behind the near plane are dropped rather than clipped
+            faces = faces[np.all(front[faces], axis=1)]
+            if self.render_mode != RenderMode.WIREFRAME:
+                if normals is None:
+                    normals = vertex_normals(vertices, faces)
+                self.fill(screen, faces, self.shade(vertices, normals), width, height)
+            if self.render_mode != RenderMode.FILLED:
+                self.lines(screen, faces, width, height, self.render_mode == RenderMode.ALL)
+
+        image = self.color.reshape(height, width, 3)
+        if scale > 1:
+            image = image.reshape(self.height, scale, self.width, scale, 3).mean(axis=(1, 3))
+        return (np.clip(image, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+
+    def project(self, vertices, width, height):
+        """Pixel x, y and NDC depth of each vertex, and whether it is in front of the near plane."""
+        projection = glm.perspective(glm.radians(self.fov), width / height, self.near, self.far)
+        mvp = _matrix(projection) @ _matrix(self.camera.calc_view_matrix())
+        clip = np.hstack((vertices, np.ones((len(vertices), 1)))) @ mvp.T
+        w = clip[:, 3]
+        front = w > self.near
+        w = np.where(front, w, 1.0)
+        screen = np.empty((len(vertices), 3))
+        screen[:, 0] = (clip[:, 0] / w + 1.0) * 0.5 * width
+        screen[:, 1] = (1.0 - clip[:, 1] / w) * 0.5 * height
+        screen[:, 2] = clip[:, 2] / w
+        return screen, front
+
+    def shade(self, vertices, normals):
+        """Lambert intensity per vertex for a light at the eye, for both sides of the surface."""
+        to_light = np.array(self.camera.eye, dtype=np.float64) - vertices
+        to_light /= np.maximum(np.linalg.norm(to_light, axis=1, keepdims=True), 1e-30)
+        facing = np.einsum('ij,ij->i', normals, to_light)
+        # Back faces are lit with the flipped normal (gl_FrontFacing in the shader); fill()
+        # picks the side per triangle
+        return AMBIENT + np.maximum(facing, 0.0), AMBIENT + np.maximum(-facing, 0.0)
+
+    def _bin(self, boxes, width, height):
+        """(triangle, x0, x1, y0, y1) for each tile a triangle's pixel box overlaps, clipped to the tile."""
+        x0, x1, y0, y1 = boxes
+        tx0, tx1 = x0 // TILE_SIZE, (x1 - 1) // TILE_SIZE
+        ty0, ty1 = y0 // TILE_SIZE, (y1 - 1) // TILE_SIZE
+        columns = tx1 - tx0 + 1
+        counts = columns * (ty1 - ty0 + 1)
+        triangle = np.repeat(np.arange(len(x0)), counts)
+        local = np.arange(len(triangle)) - np.repeat(np.cumsum(counts) - counts, counts)
+        tx = tx0[triangle] + local % columns[triangle]
+        ty = ty0[triangle] + local // columns[triangle]
+        # Tile order keeps each batch's z-buffer accesses close together
+        order = np.argsort(ty * (width // TILE_SIZE + 1) + tx, kind='stable')
+        triangle, tx, ty = triangle[order], tx[order], ty[order]
+        return (triangle,
+                np.maximum(x0[triangle], tx * TILE_SIZE), np.minimum(x1[triangle], tx * TILE_SIZE + TILE_SIZE),
+                np.maximum(y0[triangle], ty * TILE_SIZE), np.minimum(y1[triangle], ty * TILE_SIZE + TILE_SIZE))
+
+    def fill(self, screen, faces, intensity, width, height):
+        t = screen[faces]  # (n, 3, 3): x, y, depth of each corner
+        # Pixel centres (x + 0.5, y + 0.5) covered by each triangle's box
+        lo = np.floor(t[:, :, :2].min(axis=1) - 0.5).astype(np.int64) + 1
+        hi = np.floor(t[:, :, :2].max(axis=1) - 0.5).astype(np.int64) + 1
+        x0, y0 = np.maximum(lo[:, 0], 0), np.maximum(lo[:, 1], 0)
+        x1, y1 = np.minimum(hi[:, 0], width), np.minimum(hi[:, 1], height)
+
+        # Barycentric coordinates as affine functions of the pixel position
+        (ax, ay), (bx, by), (cx, cy) = t[:, 0, :2].T, t[:, 1, :2].T, t[:, 2, :2].T
+        area = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        keep = (x1 > x0) & (y1 > y0) & (np.abs(area) > 1e-12)
+        if not np.any(keep):
+            return
+        faces, t, area = faces[keep], t[keep], area[keep]
+        ax, ay, bx, by, cx, cy = ax[keep], ay[keep], bx[keep], by[keep], cx[keep], cy[keep]
+        l1 = np.stack(((cy - ay) / area, (ax - cx) / area, ((cx - ax) * ay - (cy - ay) * ax) / area), axis=1)
+        l2 = np.stack(((ay - by) / area, (bx - ax) / area, ((ax - bx) * ay - (ay - by) * ax) / area), axis=1)
+
+        # Which side faces the camera follows from the winding on screen (y points down)
+        front, back = intensity
+        light = np.where((area < 0)[:, None], front[faces], back[faces])
+
+        tri, px0, px1, py0, py1 = self._bin((x0[keep], x1[keep], y0[keep], y1[keep]), width, height)
+        sizes = (px1 - px0) * (py1 - py0)
+        ends = np.cumsum(sizes)
+        start = 0
+        while start < len(tri):
+            # As many (triangle, tile) pairs as fit in one fragment batch, and at least one
+            stop = max(start + 1, int(np.searchsorted(ends, ends[start] - sizes[start] + FRAGMENT_BATCH, 'right')))
+            self._fill_pairs(tri[start:stop], px0[start:stop], px1[start:stop], py0[start:stop],
+                             sizes[start:stop], t, l1, l2, light, width)
+            start = stop
+
+    def _fill_pairs(self, tri, x0, x1, y0, sizes, t, l1, l2, light, width):
+        pair = np.repeat(np.arange(len(tri)), sizes)
+        local = np.arange(len(pair)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        columns = (x1 - x0)[pair]
+        x = x0[pair] + local % columns
+        y = y0[pair] + local // columns
+        tri = tri[pair]
+
+        px, py = x + 0.5, y + 0.5
+        b1 = l1[tri, 0] * px + l1[tri, 1] * py + l1[tri, 2]
+        b2 = l2[tri, 0] * px + l2[tri, 1] * py + l2[tri, 2]
+        b0 = 1.0 - b1 - b2
+        inside = (b0 >= 0) & (b1 >= 0) & (b2 >= 0)
+        tri, b0, b1, b2 = tri[inside], b0[inside], b1[inside], b2[inside]
+        pixel = y[inside] * width + x[inside]
+
+        # NDC depth is affine in screen space, so plain barycentric interpolation is exact
+        z = b0 * t[tri, 0, 2] + b1 * t[tri, 1, 2] + b2 * t[tri, 2, 2]
+        passed = z < self.depth[pixel]
+        tri, b0, b1, b2, pixel, z = tri[passed], b0[passed], b1[passed], b2[passed], pixel[passed], z[passed]
+        if len(pixel) == 0:
+            return
+
+        # Nearest fragment per pixel: sort by pixel, then depth, and keep the first of each pixel
+        order = np.lexsort((z, pixel))
+        pixel = pixel[order]
+        first = np.ones(len(pixel), dtype=bool)
+        first[1:] = pixel[1:] != pixel[:-1]
+        nearest = order[first]
+        pixel = pixel[first]
+
+        tri = tri[nearest]
+        shade = b0[nearest] * light[tri, 0] + b1[nearest] * light[tri, 1] + b2[nearest] * light[tri, 2]
+        self.depth[pixel] = z[nearest]
+        self.color[pixel] = shade[:, None] * np.array(FILL_COLOR, dtype=np.float32)
+
+    def lines(self, screen, faces, width, height, depth_test):
+        """Draw every edge once, sampled about once per pixel along its longer axis."""
+        edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+        keys = np.sort(edges[:, 0] * len(screen) + edges[:, 1])
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        edges = np.stack((keys // len(screen), keys % len(screen)), axis=1)
+        a, b = screen[edges[:, 0]], screen[edges[:, 1]]
+        steps = np.ceil(np.abs(b[:, :2] - a[:, :2]).max(axis=1)).astype(np.int64) + 1
+        # A huge edge (a vertex just past the near plane) would produce millions of samples
+        steps = np.minimum(steps, 4 * (width + height))
+
+        ends = np.cumsum(steps)
+        start = 0
+        while start < len(edges):
+            stop = max(start + 1, int(np.searchsorted(ends, ends[start] - steps[start] + FRAGMENT_BATCH, 'right')))
+            count = steps[start:stop]
+            edge = np.repeat(np.arange(start, stop), count)
+            local = np.arange(len(edge)) - np.repeat(np.cumsum(count) - count, count)
+            f = (local / np.maximum(count - 1, 1)[edge - start])[:, None]
+            p = a[edge] * (1.0 - f) + b[edge] * f
+            x, y = np.floor(p[:, 0]).astype(np.int64), np.floor(p[:, 1]).astype(np.int64)
+            on_screen = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            pixel = y[on_screen] * width + x[on_screen]
+            if depth_test:
+                pixel = pixel[p[on_screen, 2] <= self.depth[pixel] + LINE_DEPTH_BIAS]
+            self.color[pixel] = LINE_COLOR
+            start = stop
+
+    def frame(self, vertices, azimuth=0.0, elevation=25.0, margin=1.1):
+        """Aim the camera at the mesh's bounding sphere from the given angles (degrees), filling the view."""
+        vertices = np.asarray(vertices, dtype=np.float64)
+        lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+        center = (lo + hi) / 2
+        radius = max(float(np.sqrt(((vertices - center) ** 2).sum(axis=1).max())), 1e-6)
+        # The narrower of the two fields of view decides the distance
+        half_fov = np.radians(self.fov) / 2
+        if self.width < self.height:
+            half_fov = np.arctan(np.tan(half_fov) * self.width / self.height)
+        distance = radius * margin / np.sin(half_fov)
+
+        azimuth, elevation = np.radians(azimuth), np.radians(elevation)
+        offset = distance * np.array([np.cos(elevation) * np.sin(azimuth), np.sin(elevation),
+                                      np.cos(elevation) * np.cos(azimuth)])
+        self.camera = Camera(glm.vec3(*(center + offset)), glm.vec3(*center), glm.vec3(0, 1, 0))
+        # Keep the depth range tight around the mesh for z-buffer precision
+        self.near = max(distance - radius * margin, distance * 1e-3)
+        self.far = distance + radius * margin
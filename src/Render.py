@@ -1,35 +1,350 @@
 # --- Render.py ---
-from enum import Enum
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import glm
 import numpy as np
 from OpenGL.GL import *
 from OpenGL.GL.shaders import compileShader, compileProgram
-from OpenGL.raw.GLU import gluPerspective
 
 from src.Camera import Camera
-
-from Parsers.stl import STLParser
+from src.History import EditHistory, ShapeTransform, VertexDelete, VertexMove
+from src.Logger import get_logger
+from src.Mode_Controller import RenderMode
+
+from geometry.bvh import BVH
+from geometry.decimate import decimate
+from geometry.normals import MeshNormals
+from geometry.topology import MeshTopology
+from geometry.weld import weld_mesh
+from Parsers.mapped import MappedSTL
+from Parsers.stl import STLParser, detect_format
 
 from tesselation.pyramid import Pyramid
 
 
-class RenderMode(Enum):
-    ALL = 0
-    FILLED = 1
-    WIREFRAME = 2
-
-
 class Shape_Renderer:
-    def __init__(self, vertices, indices, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0)):
-        self.vertices = vertices.astype(np.float32)
-        self.indices = indices.flatten().astype(np.uint32)
+    def __init__(self, vertices, indices, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), copy=True):
         self.position = list(position)
         self.rotation = list(rotation)
 
+        # GPU copies of vertices and indices, created on first draw (a GL context must be current)
+        self.vbo = None
+        self.ibo = None
+        self.needs_upload = True
+        self.dirty_range = None  # [start, end) of vertices edited since the last upload
+        self.index_dirty_range = None  # [start, end) of indices edited since the last upload
+
+        # Shader path only: vertex normals and the vertex array object tying the buffers together
+        self.normals = None  # MeshNormals, built on first upload
+        self.nbo = None
+        self.vao = None
+        self.normals_dirty = True  # rebuild all normals (and the buffer)
+        self.stale_normals = []  # vertex arrays whose normals need a local update
+        self.normal_range = None  # [start, end) of normals updated since the last upload
+
+        self._transform = None
+        self._model_matrix = None
+
+        self.lods = []  # coarser versions of this shape, finest first
+        self.set_geometry(vertices, indices, copy)
+
+    def set_geometry(self, vertices, indices, copy=True):
+        """Replace the mesh; the topology is rebuilt on first use and both buffers re-uploaded.
+
+        With copy=False, float32 vertices and uint32 indices are used as they are (e.g. memory
+        mapped), so they must be writable and not shared.
+        """
+        if copy:
+            self.vertices = vertices.astype(np.float32)
+            self.indices = indices.flatten().astype(np.uint32)
+        else:
+            self.vertices = np.asarray(vertices, dtype=np.float32)
+            self.indices = np.asarray(indices, dtype=np.uint32).reshape(-1)
+        # The topology edits the index array in place through this view
+        self.topology = MeshTopology(self.indices.reshape(-1, 3), len(self.vertices))
+        self.bvh = None
+        self.drop_lods()
+        self.fit_bounds()
+        self.mark_geometry_changed()
+
+    def prepare(self):
+        """CPU-side work otherwise done on the first draw (adjacency, normals); safe off the render thread."""
+        self.topology.build()
+        self.normals = MeshNormals(self.vertices, self.topology.faces, NORMAL_WEIGHTING, self.topology)
+        self.normals_dirty = False
+        self.stale_normals = []
+
+    def generate_lods(self, levels=3):
+        """Build up to `levels` decimated copies, each with a quarter of the triangles of the last."""
+        self.drop_lods()
+        vertices, faces = self.vertices, self.topology.faces[self.topology.face_alive]
+        for _ in range(levels):
+            target = len(faces) // 4
+            if target < LOD_MIN_FACES:
+                break
+            vertices, faces = decimate(vertices, faces, target)
+            lod = Shape_Renderer(vertices, faces)
+            # Shares the transform lists, so moving the shape moves every level
+            lod.position, lod.rotation = self.position, self.rotation
+            self.lods.append(lod)
+        return len(self.lods)
+
+    def drop_lods(self):
+        """Forget the LOD levels, e.g. after an edit made them stale."""
+        for lod in self.lods:
+            lod.release()
+        self.lods = []
+
+    def select_lod(self, eye):
+        """This shape or one of its LOD levels, depending on the distance from the camera eye."""
+        if not self.lods:
+            return self
+        center, radius = self.world_bound()
+        distance = np.linalg.norm(center - eye)
+        threshold = LOD_DISTANCE * max(radius, 1e-6)
+        level = 0
+        while level < len(self.lods) and distance > threshold:
+            level += 1
+            threshold *= 2.0
+        return self if level == 0 else self.lods[level - 1]
+
+    def fit_bounds(self):
+        """Bounding sphere of the vertices in model space, centred on their bounding box."""
+        if len(self.vertices) == 0:
+            self.bound_center, self.bound_radius = np.zeros(3), 0.0
+        else:
+            self.bound_center = (self.vertices.min(axis=0) + self.vertices.max(axis=0)) / 2.0
+            self.bound_radius = float(np.sqrt(((self.vertices - self.bound_center) ** 2).sum(axis=1).max()))
+        self._world_bound = None
+
+    def include_vertex(self, vertex_index):
+        """Grow the bounding sphere to contain an edited vertex. It never shrinks between full refits."""
+        distance = float(np.linalg.norm(self.vertices[vertex_index] - self.bound_center))
+        if distance > self.bound_radius:
+            self.bound_radius = distance
+            self._world_bound = None
+
+    def world_bound(self):
+        """(center, radius) of the bounding sphere after position/rotation, cached until either changes."""
+        model = self.model_matrix()
+        if self._world_bound is None or self._world_bound[0] is not model:
+            # model is column-major: the upper 3x3 transposed, then the translation row
+            center = model[:3, :3].T @ self.bound_center + model[3, :3]
+            self._world_bound = (model, center, self.bound_radius)
+        return self._world_bound[1], self._world_bound[2]
+
+    def get_bvh(self):
+        """Picking hierarchy over the shape's triangles, built on first use."""
+        if self.bvh is None:
+            self.bvh = BVH(self.vertices, self.topology.faces)
+        return self.bvh
+
+    def delete_vertex(self, vertex_index):
+        """Tombstone a vertex and its faces; the faces become degenerate in the index buffer."""
+        removed, rows = self.topology.delete_vertex(vertex_index)
+        self.faces_changed(removed, rows)
+        return removed, rows
+
+    def restore_vertex(self, vertex_index, removed, rows):
+        """Bring back a vertex and the faces delete_vertex() returned for it."""
+        self.topology.restore_vertex(vertex_index, removed, rows)
+        self.faces_changed(removed, rows)
+        if self.bvh is not None:
+            self.bvh.mark_dirty(removed)
+
+    def faces_changed(self, faces, rows):
+        """Schedule the index range of these faces for upload after they were deleted or restored."""
+        if len(faces) == 0:
+            return
+        self.mark_indices_dirty(3 * int(faces.min()), 3 * int(faces.max()) + 3)
+        # The faces' vertices gained or lost a face; only their normals change
+        if self.normals is not None and not self.normals_dirty:
+            self.normals.refresh(np.unique(rows))
+            self.mark_normals_dirty(np.unique(rows))
+
+    def compact(self):
+        """Drop deleted vertices and faces. Returns the old-to-new vertex map (-1 for deleted)."""
+        remap = self.topology.compact()
+        self.vertices = self.vertices[remap >= 0]
+        self.indices = self.topology.faces.reshape(-1)
+        self.bvh = None
+        self.mark_geometry_changed()
+        return remap
+
+    def model_matrix(self):
+        """Model matrix for the current position/rotation, rebuilt only when they change."""
+        transform = (*self.position, *self.rotation)
+        if transform != self._transform:
+            model = glm.translate(glm.mat4(1.0), glm.vec3(*self.position))
+            model = glm.rotate(model, glm.radians(self.rotation[0]), glm.vec3(1, 0, 0))
+            model = glm.rotate(model, glm.radians(self.rotation[1]), glm.vec3(0, 1, 0))
+            model = glm.rotate(model, glm.radians(self.rotation[2]), glm.vec3(0, 0, 1))
+            self._model_matrix = np.array(model.to_list(), dtype=np.float32)
+            self._transform = transform
+        return self._model_matrix
+
+    def mark_vertices_dirty(self, start, end=None):
+        """Schedule vertices [start, end) for re-upload; only that byte range is sent."""
+        end = start + 1 if end is None else end
+        if self.dirty_range is None:
+            self.dirty_range = [start, end]
+        else:
+            self.dirty_range = [min(self.dirty_range[0], start), max(self.dirty_range[1], end)]
+        if self.nbo is None or self.normals_dirty:
+            # No GPU normals to patch (legacy path, not drawn yet): rebuild them all on first upload
+            self.normals_dirty = True
+            return
+        self.stale_normals.append(np.arange(start, end))
+        if len(self.stale_normals) > STALE_NORMALS_LIMIT:
+            # Edits of a shape that is not being drawn (culled): keep one array of distinct vertices
+            self.stale_normals = [np.unique(np.concatenate(self.stale_normals))]
+
+    def mark_indices_dirty(self, start, end):
+        """Schedule indices [start, end) for re-upload."""
+        if self.index_dirty_range is None:
+            self.index_dirty_range = [start, end]
+        else:
+            self.index_dirty_range = [min(self.index_dirty_range[0], start), max(self.index_dirty_range[1], end)]
+
+    def mark_geometry_changed(self):
+        """Schedule a full re-upload after the vertex count or the indices changed."""
+        self.needs_upload = True
+        self.dirty_range = None
+        self.index_dirty_range = None
+        self.normals_dirty = True
+        self.stale_normals = []
+
+    def mark_normals_dirty(self, vertices):
+        """Schedule the normals of these vertices for re-upload (already up to date on the CPU)."""
+        start, end = int(vertices.min()), int(vertices.max()) + 1
+        if self.normal_range is None:
+            self.normal_range = [start, end]
+        else:
+            self.normal_range = [min(self.normal_range[0], start), max(self.normal_range[1], end)]
+
+    def upload(self):
+        """Create the buffers on first use and send pending edits."""
+        if self.vbo is None:
+            self.vbo, self.ibo = glGenBuffers(2)
+        if self.needs_upload:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices, GL_DYNAMIC_DRAW)
+            self.needs_upload = False
+        else:
+            if self.dirty_range is not None:
+                start, end = self.dirty_range
+                stride = self.vertices.strides[0]
+                glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+                glBufferSubData(GL_ARRAY_BUFFER, start * stride, (end - start) * stride, self.vertices[start:end])
+            if self.index_dirty_range is not None:
+                start, end = self.index_dirty_range
+                size = self.indices.itemsize
+                glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+                glBufferSubData(GL_ELEMENT_ARRAY_BUFFER, start * size, (end - start) * size, self.indices[start:end])
+        self.dirty_range = None
+        self.index_dirty_range = None
+
+        if self.nbo is not None:
+            self.upload_normals()
+
+    def upload_normals(self):
+        """Send vertex normals: all of them after a geometry change, else only the moved vertices' one-rings."""
+        if self.normals_dirty or self.normals is None:
+            self.normals = MeshNormals(self.vertices, self.topology.faces, NORMAL_WEIGHTING, self.topology)
+            glBindBuffer(GL_ARRAY_BUFFER, self.nbo)
+            glBufferData(GL_ARRAY_BUFFER, self.normals.vertex.nbytes, self.normals.vertex, GL_DYNAMIC_DRAW)
+            self.normals_dirty = False
+            self.stale_normals = []
+            self.normal_range = None
+            return
+        if self.stale_normals:
+            self.mark_normals_dirty(self.normals.update(np.concatenate(self.stale_normals)))
+            self.stale_normals = []
+        if self.normal_range is not None:
+            start, end = self.normal_range
+            stride = self.normals.vertex.strides[0]
+            glBindBuffer(GL_ARRAY_BUFFER, self.nbo)
+            glBufferSubData(GL_ARRAY_BUFFER, start * stride, (end - start) * stride, self.normals.vertex[start:end])
+            self.normal_range = None
+
+    def bind(self):
+        self.upload()
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+
+    def bind_vertex_array(self):
+        """Bind the shape's VAO (position at location 0, normal at 1), creating it on first use."""
+        if self.vao is not None:
+            glBindVertexArray(self.vao)
+            self.upload()
+            return
+
+        self.vao = glGenVertexArrays(1)
+        self.nbo = glGenBuffers(1)
+        # Allocate the normal buffer; normals computed beforehand (prepare()) are sent as a range
+        glBindBuffer(GL_ARRAY_BUFFER, self.nbo)
+        glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, None, GL_DYNAMIC_DRAW)
+        self.normal_range = [0, len(self.vertices)]
+        glBindVertexArray(self.vao)
+        self.upload()
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+        glEnableVertexAttribArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, self.nbo)
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, None)
+        glEnableVertexAttribArray(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+
+    def release(self):
+        for lod in self.lods:
+            lod.release()
+        if self.vao is not None:
+            glDeleteVertexArrays(1, [self.vao])
+            glDeleteBuffers(1, [self.nbo])
+            self.vao = self.nbo = None
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+            self.vbo = self.ibo = None
+            self.needs_upload = True
+
+
+# Vertices closer than this fraction of the bounding-box diagonal are merged when a generated
+# mesh is added, so edits don't open cracks at seams. STL loads are welded exactly by their readers.
+WELD_TOLERANCE = 1e-6
+# Level k of detail is used beyond LOD_DISTANCE * 2^(k-1) bounding radii from the camera
+LOD_DISTANCE = 4.0
+# Coarser levels are not generated below this many triangles
+LOD_MIN_FACES = 256
+# Vertex arrays queued for a normal update before they are merged into one
+STALE_NORMALS_LIMIT = 256
+# Vertex normal weighting for shading ("area" or "angle"); angle weighting does not depend on
+# how flat regions happen to be triangulated
+NORMAL_WEIGHTING = "angle"
+# Threads for add_shape_async/load_stl_async. Parsing, welding and tessellation are NumPy work
+# that mostly releases the GIL, and threads hand the arrays over without pickling them.
+LOAD_WORKERS = 2
+# Seconds per frame spent uploading meshes finished in the background; at least one is
+# uploaded per frame
+UPLOAD_BUDGET = 0.004
+# Axis lines from the origin (X red, Y green, Z blue) and the selected vertex colour
+AXIS_LINES = np.array([[0, 0, 0], [1, 0, 0], [0, 0, 0], [0, 1, 0], [0, 0, 0], [0, 0, 1]], dtype=np.float32)
+AXIS_COLORS = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+HIGHLIGHT_COLOR = (1.0, 1.0, 0.0)
+IDENTITY = np.identity(4, dtype=np.float32)
+
+log = get_logger("render")
+
 
 class GLRenderSystem:
-    def __init__(self, shapes=None):
+    def __init__(self, shapes=None, weld_tolerance=WELD_TOLERANCE, legacy=False):
         self.shapes = []
+        self.weld_tolerance = weld_tolerance
+        # legacy=True draws through the fixed-function pipeline, kept for comparison
+        self.legacy = legacy
 
         if shapes is None:
             pyramid = Pyramid(base_size=2.0, height=2.0, origin=[0, 0, 0], filepath="output/pyramid1.stl")
@@ -40,9 +355,6 @@ class GLRenderSystem:
                 shape.origin = [0, 0, 0]
                 self.add_shape(shape, position=position)
 
-        self.vertices = None
-        self.triangle_indices = None
-
         self.position = [0.0, 0.0, 0.0]
         self.rotation = [0.0, 0.0, 0.0]
 
@@ -53,8 +365,34 @@ class GLRenderSystem:
         self.selected_shape = 0
         self.selected_vertex = 0
 
-        glEnableClientState(GL_VERTEX_ARRAY)
-        glVertexPointer(3, GL_FLOAT, 0, self.vertices)
+        self.history = EditHistory()  # undo/redo of vertex and shape edits
+
+        self.program = None
+        self.uniforms = {}
+        self.draw_stats = []  # [draw calls, triangles] per shape in the last frame
+        self.frustum_culling = True
+        self.drawn_count = 0
+        self.culled_count = 0
+        self.projection = None
+        self.set_viewport(800, 600)
+
+        # Background loading: loader threads put (name, shape, error) on `loaded`; render() drains it
+        self.loader = None
+        self.loaded = queue.Queue()
+        self.pending_loads = 0
+        self.on_load = None  # called from a loader thread when a load finishes, e.g. to wake the window
+
+        # Shader path: axis lines and the highlighted vertex, created on first draw
+        self.overlay_vao = None
+        self.overlay_vbo = None
+        self.wide_lines = True  # False in forward-compatible contexts, where line widths above 1 are errors
+
+    def set_viewport(self, width, height):
+        """Rebuild the projection for a new framebuffer size."""
+        aspect = width / height if height > 0 else 1.0
+        projection = glm.perspective(glm.radians(60.0), aspect, 0.1, 100.0)
+        self.projection = np.array(projection.to_list(), dtype=np.float32)
+        self.projection_dirty = True
 
     def set_vertex_index(self, shape_index, vertex_index):
         self.selected_shape = shape_index
@@ -62,8 +400,107 @@ class GLRenderSystem:
 
     def add_shape(self, shape, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0)):
         vertices, faces = shape.tessellate()
-        shape = Shape_Renderer(vertices, faces, position, rotation)
-        self.shapes.append(shape)
+        self.add_mesh(vertices, faces, position, rotation)
+
+    def add_mesh(self, vertices, faces, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), weld=True):
+        self.shapes.append(self.build_shape(vertices, faces, position, rotation, weld))
+
+    def build_shape(self, vertices, faces, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), weld=True):
+        """Weld a mesh into a Shape_Renderer without adding it; no GL calls, so any thread may call it.
+
+        weld=False is for meshes that are welded already (STL loads).
+        """
+        if weld and self.weld_tolerance > 0 and len(vertices):
+            eps = self.weld_tolerance * float(np.linalg.norm(np.ptp(vertices, axis=0)))
+            vertices, faces, merged = weld_mesh(vertices, faces, eps)
+            if merged:
+                # Faces whose corners were merged into one vertex (e.g. at sphere poles) have no area left
+                faces = np.asarray(faces).reshape(-1, 3)
+                collapsed = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+                faces = faces[~collapsed]
+                log.debug("Welded %d duplicate vertices, dropped %d collapsed faces", merged, collapsed.sum())
+        return Shape_Renderer(vertices, faces, position, rotation)
+
+    def read_stl(self, filepath):
+        """Vertices and faces of an STL file, welded exactly; binary files are memory-mapped rather than read whole."""
+        if detect_format(filepath) == 'binary':
+            return MappedSTL(filepath).tessellate()
+        parser = STLParser()
+        parser.read(filepath)
+        return parser.vertices, parser.faces
+
+    def load_stl(self, filepath, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), lod_levels=0):
+        """Add a mesh from an STL file.
+
+        lod_levels > 0 also builds that many decimated levels of detail for it.
+        """
+        self.add_mesh(*self.read_stl(filepath), position, rotation, weld=False)
+        if lod_levels:
+            self.generate_lods(len(self.shapes) - 1, lod_levels)
+
+    def add_shape_async(self, shape, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), lod_levels=0):
+        """Tessellate a shape on a loader thread; it appears once render() has uploaded it.
+
+        Returns a Future of the Shape_Renderer.
+        """
+        return self.submit_load(type(shape).__name__, shape.tessellate, position, rotation, lod_levels, True)
+
+    def load_stl_async(self, filepath, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), lod_levels=0):
+        """Like load_stl(), but reading, welding and LOD generation run on a loader thread."""
+        return self.submit_load(filepath, lambda: self.read_stl(filepath), position, rotation, lod_levels, False)
+
+    def submit_load(self, name, read, position, rotation, lod_levels, weld):
+        if self.loader is None:
+            self.loader = ThreadPoolExecutor(LOAD_WORKERS, thread_name_prefix="mesh-loader")
+        self.pending_loads += 1
+        return self.loader.submit(self.load_job, name, read, position, rotation, lod_levels, weld)
+
+    def load_job(self, name, read, position, rotation, lod_levels, weld):
+        """Runs on a loader thread: everything up to the GPU upload."""
+        try:
+            shape = self.build_shape(*read(), position, rotation, weld)
+            shape.prepare()
+            if lod_levels:
+                shape.generate_lods(lod_levels)
+            self.loaded.put((name, shape, None))
+            return shape
+        except Exception as e:
+            self.loaded.put((name, None, e))
+            raise
+        finally:
+            if self.on_load is not None:
+                self.on_load()
+
+    def process_loaded(self, budget=UPLOAD_BUDGET):
+        """Add meshes finished by the loader threads, uploading them until this frame's budget is spent."""
+        start = time.perf_counter()
+        while self.pending_loads and time.perf_counter() - start < budget:
+            try:
+                name, shape, error = self.loaded.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_loads -= 1
+            if error is not None:
+                log.error("Failed to load %s: %s", name, error)
+                continue
+            if self.legacy:
+                shape.upload()
+            else:
+                shape.bind_vertex_array()
+                glBindVertexArray(0)
+            self.shapes.append(shape)
+            log.info("Loaded %s: %d triangles", name, len(shape.indices) // 3)
+
+    def loads_ready(self):
+        """True if finished loads are waiting for process_loaded()."""
+        return not self.loaded.empty()
+
+    def shutdown(self):
+        """Cancel loads that have not started; running ones finish in the background."""
+        self.on_load = None
+        if self.loader is not None:
+            self.loader.shutdown(wait=False, cancel_futures=True)
+            self.loader = None
 
     def set_render_mode(self, mode):
         """Встановлює режим рендерингу: для прикладу FILLED або WIREFRAME."""
@@ -75,7 +512,7 @@ class GLRenderSystem:
     def toggle_axes(self):
         """Toggle visibility of coordinate axes."""
         self.show_axes = not self.show_axes
-        print(f"Coordinate axes: {'visible' if self.show_axes else 'hidden'}")
+        log.info("Coordinate axes: %s", 'visible' if self.show_axes else 'hidden')
 
     def render_axes(self):
         glPushMatrix()
@@ -90,12 +527,17 @@ class GLRenderSystem:
         glLineWidth(1.0)
         glPopMatrix()
 
-    def render_vertex_highlight(self):
-        """Render a highlight for the selected vertex."""
+    def highlighted_shape(self):
+        """The shape holding the selected vertex, or None if there is no live selected vertex."""
         if self.selected_shape < 0 or self.selected_shape >= len(self.shapes):
-            return
+            return None
         shape = self.shapes[self.selected_shape]
-        if self.selected_vertex < 0 or self.selected_vertex >= len(shape.vertices):
+        return shape if shape.topology.is_alive(self.selected_vertex) else None
+
+    def render_vertex_highlight(self):
+        """Render a highlight for the selected vertex."""
+        shape = self.highlighted_shape()
+        if shape is None:
             return
 
         glPushMatrix()
@@ -138,8 +580,14 @@ class GLRenderSystem:
         uniform vec3 lightPos;
         uniform vec3 lightColor;
         uniform vec3 objectColor;
+        uniform bool unlit;
         void main() {
+            if (unlit) {
+                FragColor = vec4(objectColor, 1.0);
+                return;
+            }
             vec3 norm = normalize(Normal);
+            if (!gl_FrontFacing) norm = -norm;
             vec3 lightDir = normalize(lightPos - FragPos);
             float diff = max(dot(norm, lightDir), 0.0);
             vec3 diffuse = diff * lightColor;
@@ -153,54 +601,273 @@ class GLRenderSystem:
         fragment_shader = compileShader(fragment_shader, GL_FRAGMENT_SHADER)
         return compileProgram(vertex_shader, fragment_shader)
 
-    def delete_vertex(self, shape_index, vertex_index):
-        """Delete a vertex from a shape and update its triangles."""
+    def delete_vertex(self, shape_index, vertex_index, record=True):
+        """Delete a vertex and its triangles from a shape.
+
+        Costs O(degree): the vertex and its faces are tombstoned and the faces become degenerate
+        in the index buffer. The shape is compacted once enough garbage has built up, which
+        renumbers its vertices. Returns the vertex to select next (a live one), or -1 if none is left.
+        """
         if shape_index < 0 or shape_index >= len(self.shapes):
             raise ValueError("Invalid shape index")
 
         shape = self.shapes[shape_index]
-        if vertex_index < 0 or vertex_index >= len(shape.vertices):
-            raise ValueError("Invalid vertex index")
-
-        # Delete the vertex
-        shape.vertices = np.delete(shape.vertices, vertex_index, axis=0)
-
-        # Remove triangles containing the vertex and adjust indices
-        mask = ~np.any(shape.indices == vertex_index, axis=1)
-        shape.indices = shape.indices[mask]
-        shape.indices = np.where(shape.indices > vertex_index, shape.indices - 1, shape.indices)
-
-        # Update OpenGL vertex buffer
-        glVertexPointer(3, GL_FLOAT, 0, shape.vertices)
-
-    def move_vertex(self, shape_index, vertex_index, new_position):
+        removed, rows = shape.delete_vertex(vertex_index)
+        self.drop_stale_lods(shape_index)
+        if record:
+            self.history.record(VertexDelete(shape_index, vertex_index, removed, rows))
+
+        if shape.topology.needs_compaction():
+            # Recorded vertex and face ids would be stale after renumbering
+            if self.history.clear():
+                log.info("Cleared the undo history: shape %d was compacted", shape_index)
+            remap = shape.compact()
+            # The vertex after the deleted one, in the new numbering
+            survivors = np.flatnonzero(remap[vertex_index:] >= 0)
+            vertex_index = remap[vertex_index + survivors[0]] if len(survivors) else 0
+            if len(shape.vertices) == 0:
+                return -1
+        return shape.topology.next_alive(int(vertex_index))
+
+    def move_vertex(self, shape_index, vertex_index, new_position, record=True):
         """Move a vertex of a shape to a new position."""
         if shape_index < 0 or shape_index >= len(self.shapes):
             raise ValueError("Invalid shape index")
 
         shape = self.shapes[shape_index]
-        if vertex_index < 0 or vertex_index >= len(shape.vertices):
+        if not shape.topology.is_alive(vertex_index):
             raise ValueError("Invalid vertex index")
 
         # Update vertex position
-        shape.vertices[vertex_index] = np.array(new_position, dtype=np.float32)
+        new_position = np.array(new_position, dtype=np.float32)
+        if record:
+            self.history.record(VertexMove(shape_index, vertex_index, shape.vertices[vertex_index].copy(), new_position))
+        shape.vertices[vertex_index] = new_position
+
+        # Only this vertex's bytes go to the GPU on the next draw
+        shape.mark_vertices_dirty(vertex_index)
+        shape.include_vertex(vertex_index)
+        self.drop_stale_lods(shape_index)
+        if shape.bvh is not None:
+            shape.bvh.mark_dirty(shape.topology.vertex_faces(vertex_index))
+
+    def restore_vertex(self, shape_index, vertex_index, removed, rows):
+        """Undo a delete_vertex() that did not compact the shape."""
+        self.shapes[shape_index].restore_vertex(vertex_index, removed, rows)
+        self.drop_stale_lods(shape_index)
+
+    def record_transform(self, shape_index, old_position, old_rotation):
+        """Record a change of a shape's position/rotation, made directly on the shape, for undo."""
+        shape = self.shapes[shape_index]
+        self.history.record(ShapeTransform(shape_index, old_position, old_rotation, shape.position, shape.rotation))
+
+    def undo(self):
+        """Undo the latest edit; returns it, or None if there is nothing to undo."""
+        return self.history.undo(self)
+
+    def redo(self):
+        return self.history.redo(self)
+
+    def generate_lods(self, shape_index, levels=3):
+        """Give a shape up to `levels` decimated LOD levels, chosen per frame by camera distance."""
+        count = self.shapes[shape_index].generate_lods(levels)
+        log.info("Generated %d LOD levels for shape %d", count, shape_index)
+        return count
+
+    def drop_stale_lods(self, shape_index):
+        # Edits go to the full-resolution mesh, which is drawn at every distance from then on
+        if self.shapes[shape_index].lods:
+            self.shapes[shape_index].drop_lods()
+            log.info("Dropped the LOD levels of edited shape %d", shape_index)
 
-        # Update OpenGL vertex buffer
-        glVertexPointer(3, GL_FLOAT, 0, shape.vertices)
+    def pick(self, x, y, width, height):
+        """Cast a ray through window pixel (x, y) and select the nearest vertex of the nearest triangle hit.
+
+        Returns (shape index, face index, vertex index), or None if the ray misses every shape.
+        """
+        view = np.array(self.camera.calc_view_matrix().to_list(), dtype=np.float64).T
+        inverse = np.linalg.inv(self.projection.T.astype(np.float64) @ view)
+        ndc_x, ndc_y = 2.0 * x / width - 1.0, 1.0 - 2.0 * y / height
+        near = inverse @ [ndc_x, ndc_y, -1.0, 1.0]
+        far = inverse @ [ndc_x, ndc_y, 1.0, 1.0]
+        origin = near[:3] / near[3]
+        direction = far[:3] / far[3] - origin
+        direction /= np.linalg.norm(direction)
+
+        best = None
+        best_t = np.inf
+        for shape_index, shape in enumerate(self.shapes):
+            # Into the shape's model space; t still measures distance along the world ray
+            to_model = np.linalg.inv(shape.model_matrix().T.astype(np.float64))
+            local_origin = to_model[:3, :3] @ origin + to_model[:3, 3]
+            local_direction = to_model[:3, :3] @ direction
+            face, t = shape.get_bvh().intersect(local_origin, local_direction)
+            if t < best_t:
+                best, best_t = (shape_index, face, local_origin + t * local_direction), t
+        if best is None:
+            return None
+
+        shape_index, face, point = best
+        corners = self.shapes[shape_index].topology.faces[face]
+        vertex = int(corners[np.argmin(np.linalg.norm(self.shapes[shape_index].vertices[corners] - point, axis=1))])
+        self.selected_shape = shape_index
+        self.selected_vertex = vertex
+        return shape_index, face, vertex
 
     def render(self):
+        self.process_loaded()
         glClearColor(0.2, 0.3, 0.3, 0.5)
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
+        view_matrix = np.array(self.camera.calc_view_matrix().to_list(), dtype=np.float32)
+        self.draw_stats = [[0, 0] for _ in self.shapes]
+        visible = self.visible_shapes(view_matrix)
+        self.drawn_count = len(visible)
+        self.culled_count = len(self.shapes) - len(visible)
+        if self.legacy:
+            self.render_legacy(view_matrix, visible)
+            if self.show_axes:
+                self.render_axes()
+            self.render_vertex_highlight()
+        else:
+            self.render_shaded(view_matrix, visible)
+            self.render_overlay()
+
+    def frustum_planes(self, view_matrix):
+        """The six clip planes of projection * view as rows (a, b, c, d), normals pointing inwards."""
+        clip = self.projection.T.astype(np.float64) @ view_matrix.T
+        planes = np.array([clip[3] + clip[0], clip[3] - clip[0],
+                           clip[3] + clip[1], clip[3] - clip[1],
+                           clip[3] + clip[2], clip[3] - clip[2]])
+        return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+    def visible_shapes(self, view_matrix):
+        """Indices of shapes whose bounding sphere intersects the view frustum, tested all at once."""
+        if not self.frustum_culling or not self.shapes:
+            return list(range(len(self.shapes)))
+        bounds = [shape.world_bound() for shape in self.shapes]
+        centers = np.array([center for center, _ in bounds])
+        radii = np.array([radius for _, radius in bounds])
+        planes = self.frustum_planes(view_matrix)
+        distances = centers @ planes[:, :3].T + planes[:, 3]
+        return np.flatnonzero(np.all(distances >= -radii[:, None], axis=1)).tolist()
+
+    def use_program(self):
+        """Compile the shader program on first use and cache its uniform locations."""
+        if self.program is None:
+            self.program = self.create_shader_program()
+            for name in ("model", "view", "projection", "lightPos", "lightColor", "objectColor", "unlit"):
+                self.uniforms[name] = glGetUniformLocation(self.program, name)
+            self.projection_dirty = True
+            self.wide_lines = not glGetIntegerv(GL_CONTEXT_FLAGS) & GL_CONTEXT_FLAG_FORWARD_COMPATIBLE_BIT
+        glUseProgram(self.program)
+
+    def render_passes(self):
+        """(polygon mode, colour, lit) for each pass of the current render mode."""
+        fill = (GL_FILL, (0.5, 0.5, 0.5), True)
+        line = (GL_LINE, (0.5, 0.0, 0.0), False)
+        if self.render_mode == RenderMode.FILLED:
+            return [fill]
+        if self.render_mode == RenderMode.WIREFRAME:
+            return [line]
+        return [fill, line]
+
+    def render_shaded(self, view_matrix, visible):
+        self.use_program()
+        uniforms = self.uniforms
+        glUniformMatrix4fv(uniforms["view"], 1, GL_FALSE, view_matrix)
+        if self.projection_dirty:
+            glUniformMatrix4fv(uniforms["projection"], 1, GL_FALSE, self.projection)
+            self.projection_dirty = False
+        glUniform3f(uniforms["lightPos"], *self.camera.eye)
+        glUniform3f(uniforms["lightColor"], 1.0, 1.0, 1.0)
+
+        # One pass per polygon mode over all shapes, so mode and colour change once per pass.
+        # The model uniform is only re-sent when the next shape's matrix differs from the last one.
+        last_model = None
+        eye = np.array(self.camera.eye)
+        for polygon_mode, color, lit in self.render_passes():
+            glPolygonMode(GL_FRONT_AND_BACK, polygon_mode)
+            glUniform3f(uniforms["objectColor"], *color)
+            glUniform1i(uniforms["unlit"], not lit)
+            if polygon_mode == GL_LINE:
+                glEnable(GL_POLYGON_OFFSET_LINE)
+            for index in visible:
+                shape, stats = self.shapes[index], self.draw_stats[index]
+                model = shape.model_matrix()
+                if model is not last_model:
+                    glUniformMatrix4fv(uniforms["model"], 1, GL_FALSE, model)
+                    last_model = model
+                lod = shape.select_lod(eye)
+                lod.bind_vertex_array()
+                count = len(lod.indices)
+                glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, None)
+                stats[0] += 1
+                stats[1] += count // 3
+            if polygon_mode == GL_LINE:
+                glDisable(GL_POLYGON_OFFSET_LINE)
+
+        glBindVertexArray(0)
+        glUseProgram(0)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+
+    def bind_overlay_vertex_array(self):
+        """Bind the VAO of AXIS_LINES followed by one slot for the highlighted vertex."""
+        if self.overlay_vao is None:
+            self.overlay_vao = glGenVertexArrays(1)
+            glBindVertexArray(self.overlay_vao)
+            self.overlay_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.overlay_vbo)
+            data = np.concatenate((AXIS_LINES, np.zeros((1, 3), dtype=np.float32)))
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_DYNAMIC_DRAW)
+            glEnableVertexAttribArray(0)
+            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+        else:
+            glBindVertexArray(self.overlay_vao)
+            glBindBuffer(GL_ARRAY_BUFFER, self.overlay_vbo)
+
+    def render_overlay(self):
+        """Axes and the selected vertex through the shader program, unlit; view and projection are
+        the uniforms render_shaded() set this frame."""
+        self.use_program()
+        uniforms = self.uniforms
+        glUniform1i(uniforms["unlit"], True)
+        self.bind_overlay_vertex_array()
+
+        if self.show_axes:
+            glUniformMatrix4fv(uniforms["model"], 1, GL_FALSE, IDENTITY)
+            if self.wide_lines:
+                glLineWidth(2.0)
+            for axis, color in enumerate(AXIS_COLORS):
+                glUniform3f(uniforms["objectColor"], *color)
+                glDrawArrays(GL_LINES, 2 * axis, 2)
+            glLineWidth(1.0)
+
+        shape = self.highlighted_shape()
+        if shape is not None:
+            vertex = np.ascontiguousarray(shape.vertices[self.selected_vertex], dtype=np.float32)
+            glBufferSubData(GL_ARRAY_BUFFER, AXIS_LINES.nbytes, vertex.nbytes, vertex)
+            glUniformMatrix4fv(uniforms["model"], 1, GL_FALSE, shape.model_matrix())
+            glUniform3f(uniforms["objectColor"], *HIGHLIGHT_COLOR)
+            glPointSize(10.0)
+            glDrawArrays(GL_POINTS, len(AXIS_LINES), 1)
+            glPointSize(1.0)
+
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def render_legacy(self, view_matrix, visible):
+        """Fixed-function path, kept for comparison benchmarks."""
         glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        gluPerspective(60, 800 / 600, 0.1, 100.0)
+        glLoadMatrixf(self.projection)
 
         glMatrixMode(GL_MODELVIEW)
-        view_matrix = np.array(self.camera.calc_view_matrix().to_list(), dtype=np.float32)
         glLoadMatrixf(view_matrix)
 
-        for shape in self.shapes:
+        eye = np.array(self.camera.eye)
+        for index in visible:
+            shape, stats = self.shapes[index], self.draw_stats[index]
             glPushMatrix()
             glTranslatef(*shape.position)
             glRotatef(shape.rotation[0], 1, 0, 0)
@@ -208,30 +875,34 @@ class GLRenderSystem:
             glRotatef(shape.rotation[2], 0, 0, 1)
 
             glEnableClientState(GL_VERTEX_ARRAY)
-            glVertexPointer(3, GL_FLOAT, 0, shape.vertices)
+            lod = shape.select_lod(eye)
+            lod.bind()
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            count = len(lod.indices)
+            passes = 2 if self.render_mode == RenderMode.ALL else 1
+            stats[0] += passes
+            stats[1] += passes * (count // 3)
 
             if self.render_mode == RenderMode.FILLED:
                 glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
                 glColor3f(0.5, 0.5, 0.5)
-                glDrawElements(GL_TRIANGLES, len(shape.indices), GL_UNSIGNED_INT, shape.indices)
+                glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, None)
             elif self.render_mode == RenderMode.WIREFRAME:
                 glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
                 glColor3f(0.5, 0.0, 0.0)
-                glDrawElements(GL_TRIANGLES, len(shape.indices), GL_UNSIGNED_INT, shape.indices)
+                glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, None)
             elif self.render_mode == RenderMode.ALL:
                 glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
                 glColor3f(0.5, 0.5, 0.5)
-                glDrawElements(GL_TRIANGLES, len(shape.indices), GL_UNSIGNED_INT, shape.indices)
+                glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, None)
 
                 glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
                 glColor3f(0.5, 0.0, 0.0)
                 glEnable(GL_POLYGON_OFFSET_LINE)
-                glDrawElements(GL_TRIANGLES, len(shape.indices), GL_UNSIGNED_INT, shape.indices)
+                glDrawElements(GL_TRIANGLES, count, GL_UNSIGNED_INT, None)
                 glDisable(GL_POLYGON_OFFSET_LINE)
 
             glPopMatrix()
 
-        if self.show_axes:
-            self.render_axes()
-
-        self.render_vertex_highlight()
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
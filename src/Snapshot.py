@@ -0,0 +1,130 @@
+# --- Snapshot.py ---
+import json
+import os
+import struct
+
+import glm
+import numpy as np
+
+from src.Logger import get_logger
+from src.Mode_Controller import RenderMode
+from src.Render import Shape_Renderer
+
+MAGIC = b"MESHSNAP"
+VERSION = 1
+# Every buffer starts on this boundary, so it can be viewed in place from the mapping
+ALIGNMENT = 64
+# Magic, version and JSON header length
+PREAMBLE = struct.Struct("<8sII")
+
+log = get_logger("snapshot")
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _live_geometry(shape):
+    """A shape's vertices and faces without tombstones, leaving the shape itself untouched."""
+    topology = shape.topology
+    vertices, faces = shape.vertices, topology.faces
+    if topology.dead_faces:
+        faces = faces[topology.face_alive]
+    if topology.dead_vertices:
+        remap = np.cumsum(topology.vertex_alive) - 1
+        vertices = vertices[topology.vertex_alive]
+        faces = remap[faces].astype(np.uint32)
+    return vertices, faces
+
+
+def save_scene(render_system, filepath):
+    """Write every shape's vertices and indices, its position and rotation, and the camera.
+
+    Layout: MAGIC, version, header length, a JSON header, then each array as raw
+    little-endian bytes starting at an ALIGNMENT boundary. The header holds each array's
+    offset, dtype and shape. The file is written next to the target and moved into place,
+    so an interrupted save keeps the previous snapshot.
+
+    Raises RuntimeError while background loads are pending: their shapes are not in the scene
+    yet and would be missing from the snapshot.
+    """
+    if render_system.pending_loads:
+        raise RuntimeError(f"{render_system.pending_loads} mesh load(s) still pending; not saving {filepath}")
+    arrays = []
+    shapes = []
+    for shape in render_system.shapes:
+        vertices, faces = _live_geometry(shape)
+        shapes.append({"position": [float(x) for x in shape.position],
+                       "rotation": [float(x) for x in shape.rotation],
+                       "vertices": len(arrays), "indices": len(arrays) + 1})
+        arrays.append(np.ascontiguousarray(vertices, dtype='<f4'))
+        arrays.append(np.ascontiguousarray(faces, dtype='<u4').reshape(-1))
+
+    camera = render_system.camera
+    header = {"camera": {"eye": list(camera.eye), "target": list(camera.target), "up": list(camera.up)},
+              "render_mode": render_system.render_mode.name, "shapes": shapes, "arrays": []}
+    # The offsets depend on the header length and the header holds the offsets: reserve room
+    # for the header and grow it until the encoded header fits
+    header_size = 4096 + 160 * len(arrays)
+    while True:
+        offset = _aligned(PREAMBLE.size + header_size)
+        header["arrays"] = []
+        for array in arrays:
+            header["arrays"].append({"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)})
+            offset = _aligned(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+        if len(encoded) <= header_size:
+            break
+        header_size = len(encoded)
+
+    temp = filepath + ".tmp"
+    with open(temp, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for array, entry in zip(arrays, header["arrays"]):
+            f.seek(entry["offset"])
+            f.write(memoryview(array))
+    os.replace(temp, filepath)
+    log.info("Scene saved to %s: %d shapes", filepath, len(shapes))
+
+
+def load_scene(render_system, filepath):
+    """Replace render_system's shapes and camera with a snapshot.
+
+    The file is memory-mapped copy-on-write: shape arrays are views of the mapping, pages are
+    read as they are touched, and edits stay in memory until the scene is saved again. The
+    undo history is cleared, since its entries refer to the replaced shapes.
+    """
+    with open(filepath, 'rb') as f:
+        magic, version, header_size = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a scene snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} in {filepath}")
+        header = json.loads(f.read(header_size))
+
+    data = np.memmap(filepath, dtype=np.uint8, mode='c')
+    arrays = []
+    for entry in header["arrays"]:
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"]))
+        end = entry["offset"] + count * dtype.itemsize
+        if end > len(data):
+            raise ValueError(f"Truncated snapshot {filepath}: expected {end} bytes")
+        arrays.append(data[entry["offset"]:end].view(dtype).reshape(entry["shape"]))
+
+    for shape in render_system.shapes:
+        shape.release()
+    render_system.shapes = [Shape_Renderer(arrays[entry["vertices"]], arrays[entry["indices"]],
+                                           entry["position"], entry["rotation"], copy=False)
+                            for entry in header["shapes"]]
+
+    camera = header["camera"]
+    render_system.camera.eye = glm.vec3(*camera["eye"])
+    render_system.camera.target = glm.vec3(*camera["target"])
+    render_system.camera.up = glm.vec3(*camera["up"])
+    render_system.render_mode = RenderMode[header["render_mode"]]
+    render_system.selected_shape = 0
+    render_system.selected_vertex = 0
+    render_system.history.clear()
+    log.info("Scene loaded from %s: %d shapes", filepath, len(render_system.shapes))
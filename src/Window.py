@@ -1,17 +1,31 @@
 # --- Window.py ---
+import time
+
 import glfw
 from OpenGL.GL import *
 
+from src.Logger import get_logger
 from src.Mode_Controller import ModeController
 from src.Mode_Controller import ControlMode
 from src.Render import RenderMode
 
+log = get_logger("window")
+# Drag messages fire on every mouse-move event; they are debug-level and at most a few per second
+drag_log = get_logger("window.drag", rate_limit=0.25)
+
 
 class GLWindow:
-    def __init__(self, width=800, height=600, title="Lab 1: OpenGL Window"):
+    def __init__(self, width=800, height=600, title="Lab 1: OpenGL Window", profiler=None, on_demand=False,
+                 max_fps=None, core_profile=False):
         if not glfw.init():
             raise Exception("Failed to initialize GLFW")
 
+        if core_profile:
+            # The shader render path only; GLRenderSystem(legacy=True) needs a compatibility context
+            glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+            glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+            glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+            glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, True)
         self.window = glfw.create_window(width, height, title, None, None)
         if not self.window:
             glfw.terminate()
@@ -23,6 +37,8 @@ class GLWindow:
         glfw.set_mouse_button_callback(self.window, self.mouse_button_callback)
         glfw.set_cursor_pos_callback(self.window, self.cursor_pos_callback)
         glfw.set_scroll_callback(self.window, self.scroll_callback)
+        glfw.set_framebuffer_size_callback(self.window, self.framebuffer_size_callback)
+        glfw.set_window_refresh_callback(self.window, self.window_refresh_callback)
 
         glViewport(0, 0, width, height)
         glEnable(GL_DEPTH_TEST)
@@ -38,11 +54,36 @@ class GLWindow:
 
         self.move_sensitivity = 0.05
 
+        self.title = title
+        self.profiler = profiler
+
+        # on_demand: sleep in glfw.wait_events() until something changes instead of redrawing nonstop
+        # (off by default, so profiling and benchmark loops get continuous frames).
+        # max_fps caps the frame rate in either mode.
+        self.on_demand = on_demand
+        self.max_fps = max_fps
+        self.dirty = True
+        self.last_frame = 0.0
+
+        # Cursor movement since the last frame; applied once per frame, however many events arrived
+        self.pending_dx = 0.0
+        self.pending_dy = 0.0
+
+    def request_redraw(self):
+        """Mark the scene dirty and wake the loop. Safe to call from other threads."""
+        self.dirty = True
+        glfw.post_empty_event()
+
     def key_callback(self, window, key, scancode, action, mods):
+        self.dirty = True
         if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
             self.running = False
             glfw.set_window_should_close(window, True)
 
+        elif key == glfw.KEY_F3 and action == glfw.PRESS:
+            if self.profiler:
+                self.profiler.hud = None if self.profiler.hud == "title" else "title"
+
         elif key == glfw.KEY_M and action == glfw.PRESS:
             if self.render_system:
                 current_mode = self.render_system.render_mode
@@ -53,7 +94,18 @@ class GLWindow:
                 else:
                     new_mode = RenderMode.FILLED
                 self.render_system.set_render_mode(new_mode)
-                print(f"Switched to render mode: {new_mode}")
+                log.info("Switched to render mode: %s", new_mode)
+
+        elif key == glfw.KEY_Z and action in (glfw.PRESS, glfw.REPEAT) and mods & glfw.MOD_CONTROL:
+            if self.render_system:
+                if mods & glfw.MOD_SHIFT:
+                    self.step_history(self.render_system.redo, "Redid")
+                else:
+                    self.step_history(self.render_system.undo, "Undid")
+
+        elif key == glfw.KEY_Y and action in (glfw.PRESS, glfw.REPEAT) and mods & glfw.MOD_CONTROL:
+            if self.render_system:
+                self.step_history(self.render_system.redo, "Redid")
 
         elif key == glfw.KEY_TAB and action == glfw.PRESS:
             self.mode_controller.toggle_mode()
@@ -72,8 +124,9 @@ class GLWindow:
                 if 0 <= shape_index < len(self.render_system.shapes):
                     vertex_count = len(self.render_system.shapes[shape_index].vertices)
                     vertex_index, shape_index = self.mode_controller.select_next_vertex(vertex_count)
+                    vertex_index = self.skip_deleted(shape_index, vertex_index, 1)
                     self.render_system.set_vertex_index(shape_index, vertex_index)
-                    print(f"Selected vertex: {self.mode_controller.selected_vertex_index}")
+                    log.info("Selected vertex: %d", self.mode_controller.selected_vertex_index)
 
         elif key == glfw.KEY_DOWN and action == glfw.PRESS:
             if self.render_system and self.mode_controller.is_triangle_mode():
@@ -81,8 +134,9 @@ class GLWindow:
                 if 0 <= shape_index < len(self.render_system.shapes):
                     vertex_count = len(self.render_system.shapes[shape_index].vertices)
                     vertex_index, shape_index = self.mode_controller.select_previous_vertex(vertex_count)
+                    vertex_index = self.skip_deleted(shape_index, vertex_index, -1)
                     self.render_system.set_vertex_index(shape_index, vertex_index)
-                    print(f"Selected vertex: {self.mode_controller.selected_vertex_index}")
+                    log.info("Selected vertex: %d", self.mode_controller.selected_vertex_index)
 
         elif key == glfw.KEY_D and action == glfw.PRESS:
             if self.render_system and self.mode_controller.is_triangle_mode():
@@ -90,30 +144,76 @@ class GLWindow:
                 vertex_index = self.mode_controller.selected_vertex_index
                 if 0 <= shape_index < len(self.render_system.shapes):
                     try:
-                        self.render_system.delete_vertex(shape_index, vertex_index)
-                        print(f"Deleted vertex {vertex_index} from shape {shape_index}")
-                        # Reset vertex index if necessary
-                        vertex_count = len(self.render_system.shapes[shape_index].vertices)
-                        if self.mode_controller.selected_vertex_index >= vertex_count:
-                            self.mode_controller.selected_vertex_index = max(0, vertex_count - 1)
+                        next_vertex = self.render_system.delete_vertex(shape_index, vertex_index)
+                        log.info("Deleted vertex %d from shape %d", vertex_index, shape_index)
+                        # Select the next remaining vertex (indices change when the shape is compacted)
+                        self.mode_controller.selected_vertex_index = max(0, next_vertex)
+                        self.render_system.set_vertex_index(shape_index, max(0, next_vertex))
                     except ValueError as e:
-                        print(f"Error deleting vertex: {e}")
+                        log.error("Error deleting vertex: %s", e)
+
+    def step_history(self, step, verb):
+        """Undo or redo one edit and select what it touched."""
+        entry = step()
+        if entry is None:
+            log.info("Nothing to %s", "undo" if verb == "Undid" else "redo")
+            return
+        log.info("%s %s", verb, entry)
+        self.mode_controller.selected_shape_index = entry.shape
+        if hasattr(entry, "vertex") and self.render_system.shapes[entry.shape].topology.is_alive(entry.vertex):
+            self.mode_controller.selected_vertex_index = entry.vertex
+            self.render_system.set_vertex_index(entry.shape, entry.vertex)
+
+    def skip_deleted(self, shape_index, vertex_index, step):
+        """Move the selection past deleted vertices in the direction of step."""
+        alive = self.render_system.shapes[shape_index].topology.next_alive(vertex_index, step)
+        self.mode_controller.selected_vertex_index = max(0, alive)
+        return max(0, alive)
 
     def mouse_button_callback(self, window, button, action, mods):
+        self.dirty = True
+        if action == glfw.RELEASE and self.render_system:
+            # Apply the rest of the drag, then close its undo entry
+            self.apply_pending_input()
+            self.render_system.history.seal()
         if button == glfw.MOUSE_BUTTON_LEFT:
             self.left_mouse_pressed = (action == glfw.PRESS)
+            if action == glfw.PRESS and self.render_system and self.mode_controller.is_triangle_mode():
+                self.pick_at_cursor()
         elif button == glfw.MOUSE_BUTTON_RIGHT:
             self.right_mouse_pressed = (action == glfw.PRESS)
         elif button == glfw.MOUSE_BUTTON_MIDDLE:
             self.middle_mouse_pressed = (action == glfw.PRESS)
 
+    def pick_at_cursor(self):
+        """Select the vertex under the cursor; dragging then moves it. A miss keeps the selection."""
+        xpos, ypos = glfw.get_cursor_pos(self.window)
+        width, height = glfw.get_window_size(self.window)
+        picked = self.render_system.pick(xpos, ypos, width, height)
+        if picked is None:
+            return
+        shape_index, face, vertex_index = picked
+        self.mode_controller.selected_shape_index = shape_index
+        self.mode_controller.selected_triangle_index = face
+        self.mode_controller.selected_vertex_index = vertex_index
+        log.info("Picked vertex %d of triangle %d on shape %d", vertex_index, face, shape_index)
+
     def cursor_pos_callback(self, window, xpos, ypos):
         dx = xpos - self.last_x
         dy = ypos - self.last_y
         self.last_x = xpos
         self.last_y = ypos
 
-        if self.render_system is None:
+        if self.left_mouse_pressed or self.right_mouse_pressed or self.middle_mouse_pressed:
+            self.pending_dx += dx
+            self.pending_dy += dy
+            self.dirty = True
+
+    def apply_pending_input(self):
+        """Apply the cursor movement accumulated since the last frame as a single drag step."""
+        dx, dy = self.pending_dx, self.pending_dy
+        self.pending_dx = self.pending_dy = 0.0
+        if self.render_system is None or (dx == 0.0 and dy == 0.0):
             return
 
         # Camera controls (unchanged)
@@ -124,34 +224,35 @@ class GLWindow:
             vertex_index = self.mode_controller.selected_vertex_index
             if 0 <= shape_index < len(self.render_system.shapes):
                 shape = self.render_system.shapes[shape_index]
-                if vertex_index < len(shape.vertices):
+                if shape.topology.is_alive(vertex_index):
                     current_pos = shape.vertices[vertex_index].copy()
                     if self.left_mouse_pressed:
                         current_pos[0] += dx * self.move_sensitivity
                         current_pos[1] -= dy * self.move_sensitivity
                         self.render_system.move_vertex(shape_index, vertex_index, current_pos)
-                        print(f"[Vertex] Moved vertex {vertex_index} of shape {shape_index} to {current_pos}")
+                        drag_log.debug("[Vertex] Moved vertex %d of shape %d to %s", vertex_index, shape_index, current_pos)
                     elif self.right_mouse_pressed:
                         current_pos[2] -= dy * self.move_sensitivity
                         self.render_system.move_vertex(shape_index, vertex_index, current_pos)
-                        print(f"[Vertex] Moved vertex {vertex_index} of shape {shape_index} to {current_pos}")
+                        drag_log.debug("[Vertex] Moved vertex %d of shape %d to %s", vertex_index, shape_index, current_pos)
 
         elif self.mode_controller.is_shape_mode():
             index = self.mode_controller.selected_shape_index
             if 0 <= index < len(self.render_system.shapes):
                 shape = self.render_system.shapes[index]
+                old_position, old_rotation = list(shape.position), list(shape.rotation)
 
                 if self.left_mouse_pressed:
                     shape.position[0] += dx * self.move_sensitivity
                     shape.position[1] -= dy * self.move_sensitivity
-                    print(f"[Shape] Moved shape {index} to {shape.position}")
+                    drag_log.debug("[Shape] Moved shape %d to %s", index, shape.position)
                 elif self.right_mouse_pressed:
                     shape.position[2] -= dy * self.move_sensitivity
                 elif self.middle_mouse_pressed:
                     shape.rotation[1] += dx * 0.5
                     shape.rotation[0] += dy * 0.5
-                    print(f"[Shape] Rotated shape {index} to {shape.rotation}")
-
+                    drag_log.debug("[Shape] Rotated shape %d to %s", index, shape.rotation)
+                self.render_system.record_transform(index, old_position, old_rotation)
 
             # 🎥 CAMERA mode: move camera with left/right mouse
         else:
@@ -161,14 +262,78 @@ class GLWindow:
                 cam.orbit(-dx * 0.5, -dy * 0.5)
 
     def scroll_callback(self, window, xoffset, yoffset):
+        self.dirty = True
         if self.render_system:
             self.render_system.camera.zoom(-yoffset * 0.5)
 
+    def framebuffer_size_callback(self, window, width, height):
+        self.dirty = True
+        glViewport(0, 0, width, height)
+        if self.render_system:
+            self.render_system.set_viewport(width, height)
+
+    def window_refresh_callback(self, window):
+        self.dirty = True
+
     def run(self, render_system):
         self.render_system = render_system
-        while self.running and not glfw.window_should_close(self.window):
-            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-            render_system.render()
-            glfw.swap_buffers(self.window)
-            glfw.poll_events()
-        glfw.terminate()
+        render_system.set_viewport(*glfw.get_framebuffer_size(self.window))
+        # Finished background loads wake the loop so they get uploaded
+        render_system.on_load = self.request_redraw
+        title = self.title
+        try:
+            while self.running and not glfw.window_should_close(self.window):
+                if self.dirty or not self.on_demand:
+                    self.draw_frame()
+                    if self.window_title() != title:
+                        title = self.window_title()
+                        glfw.set_window_title(self.window, title)
+                self.wait()
+        finally:
+            render_system.shutdown()
+            if self.profiler:
+                self.profiler.close()
+                log.info("Frame times (ms): %s", self.profiler.format_summary())
+            glfw.terminate()
+
+    def window_title(self):
+        """The title plus the loads in progress and, with hud="title", the profiler summary."""
+        parts = [self.title]
+        if self.render_system.pending_loads:
+            parts.append(f"loading {self.render_system.pending_loads} mesh(es)...")
+        if self.profiler and self.profiler.hud == "title" and self.profiler.hud_text:
+            parts.append(self.profiler.hud_text)
+        return " | ".join(parts)
+
+    def draw_frame(self):
+        profiler = self.profiler
+        self.last_frame = time.perf_counter()
+        if profiler:
+            profiler.begin_frame()
+        # Cleared first, so events handled while drawing schedule the next frame
+        self.dirty = False
+        self.apply_pending_input()
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        self.render_system.render()
+        if self.render_system.loads_ready():
+            # More finished meshes than fit in this frame's upload budget
+            self.dirty = True
+        if profiler:
+            profiler.mark("render")
+        glfw.swap_buffers(self.window)
+        if profiler:
+            profiler.mark("swap")
+        glfw.poll_events()
+        if profiler:
+            profiler.mark("poll")
+            profiler.end_frame(self.render_system.draw_stats)
+
+    def wait(self):
+        """Block until the next frame is due: for the frame cap, and while idle in on-demand mode."""
+        if self.max_fps:
+            deadline = self.last_frame + 1.0 / self.max_fps
+            # Events arriving meanwhile are handled (and coalesced) but do not start a frame early
+            while self.running and (remaining := deadline - time.perf_counter()) > 0:
+                glfw.wait_events_timeout(remaining)
+        if self.on_demand and not self.dirty:
+            glfw.wait_events()
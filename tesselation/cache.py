@@ -0,0 +1,48 @@
+import threading
+from collections import OrderedDict
+
+
+class GeometryCache:
+    """Process-wide LRU cache of tessellated geometry keyed by shape type and parameters.
+
+    Cached arrays are marked read-only, since every caller with the same key shares them.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Return the cached (vertices, faces) for key, calling build() on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        arrays = tuple(build())
+        for array in arrays:
+            array.flags.writeable = False
+
+        with self._lock:
+            self._entries[key] = arrays
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return arrays
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+geometry_cache = GeometryCache()
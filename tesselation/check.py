@@ -0,0 +1,68 @@
+import json
+import sys
+import time
+from contextlib import redirect_stdout
+
+from geometry.validate import check, repair
+from Parsers.stl import STLParser
+from tesselation.command import Shape
+
+
+def write_report(report, filepath=None):
+    """Print the report as one JSON line, and write it to filepath if given.
+
+    The commands send their progress messages ("STL loaded from ...") to stderr, so stdout
+    holds only this line and can be piped into a JSON reader.
+    """
+    encoded = json.dumps(report)
+    print(encoded)
+    if filepath:
+        with open(filepath, 'w') as f:
+            f.write(encoded + "\n")
+
+
+class Check:
+    """Report holes, non-manifold edges, duplicate and degenerate facets and inconsistent winding
+    of an STL file as JSON. weld_eps welds vertices closer than that first (default: exact)."""
+
+    def __init__(self, input_filepath, report=None, weld_eps=None):
+        self.input_filepath = input_filepath
+        self.report = report
+        self.weld_eps = weld_eps
+
+    def execute(self):
+        parser = STLParser(self.weld_eps or 0.0)
+        with redirect_stdout(sys.stderr):
+            parser.load(self.input_filepath)
+        start = time.perf_counter()
+        report = {"input": self.input_filepath, **check(parser.vertices, parser.faces)}
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        write_report(report, self.report)
+        return report
+
+
+class Repair(Shape):
+    """Remove degenerate and duplicate facets, fix the winding and save the result.
+
+    The JSON report holds what was changed and a check of the repaired mesh.
+    """
+
+    def __init__(self, input_filepath, filepath, stl_format=None, report=None, weld_eps=None):
+        super().__init__(filepath, stl_format)
+        self.input_filepath = input_filepath
+        self.report = report
+        self.weld_eps = weld_eps
+
+    def execute(self):
+        parser = STLParser(self.weld_eps or 0.0)
+        with redirect_stdout(sys.stderr):
+            parser.load(self.input_filepath)
+        start = time.perf_counter()
+        faces, changes = repair(parser.vertices, parser.faces)
+        report = {"input": self.input_filepath, "output": self.filepath, **changes,
+                  "result": check(parser.vertices, faces)}
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        with redirect_stdout(sys.stderr):
+            self.save_stl(parser.vertices, faces)
+        write_report(report, self.report)
+        return report
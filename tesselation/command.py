@@ -1,11 +1,13 @@
 import numpy as np
 
 from Parsers.stl import STLParser
+from tesselation.cache import geometry_cache
 
 
 class Shape:
-    def __init__(self, filepath):
+    def __init__(self, filepath, stl_format=None):
         self.filepath = filepath
+        self.stl_format = stl_format
         self.origin = None
 
     def execute(self):
@@ -13,8 +15,21 @@ class Shape:
 
     def save_stl(self, vertices, faces):
         parser = STLParser()
-        parser.write(self.filepath, vertices, faces)
+        parser.write(self.filepath, vertices, faces, stl_format=self.stl_format)
         print(f"STL saved to {self.filepath}")
 
+    def cache_key(self):
+        """Shape type and parameters that fully determine unit_geometry()."""
+        raise NotImplementedError("Subclasses should implement this!")
+
+    def unit_geometry(self):
+        """Vertices and faces of the shape placed at the origin."""
+        raise NotImplementedError("Subclasses should implement this!")
+
     def tessellate(self):
-        return NotImplementedError("Subclasses should implement this!")
\ No newline at end of file
+        # The geometry at the origin is cached; the shape's origin is applied as an offset.
+        # Faces, and vertices of shapes at the origin, are the shared read-only cached arrays.
+        vertices, faces = geometry_cache.get(self.cache_key(), self.unit_geometry)
+        if self.origin is None or not np.any(self.origin):
+            return vertices, faces
+        return vertices + self.origin, faces
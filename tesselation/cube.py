@@ -3,8 +3,8 @@ from tesselation.command import Shape
 
 
 class Cube(Shape):
-    def __init__(self, L, origin, filepath):
-        super().__init__(filepath)
+    def __init__(self, L, origin, filepath, stl_format=None):
+        super().__init__(filepath, stl_format)
         self.L = L
         self.origin = np.array(origin)
 
@@ -12,11 +12,14 @@ class Cube(Shape):
         vertices, faces = self.tessellate()
         self.save_stl(vertices, faces)
 
-    def tessellate(self):
+    def cache_key(self):
+        return ("Cube", self.L)
+
+    def unit_geometry(self):
         vertices = np.array([
             [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
             [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]
-        ]) * self.L + self.origin
+        ]) * float(self.L)
 
         faces = np.array([
             [0, 1, 2], [2, 3, 0],
@@ -28,4 +31,3 @@ class Cube(Shape):
         ])
 
         return vertices, faces
-
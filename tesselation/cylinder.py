@@ -3,54 +3,42 @@ import numpy as np
 
 
 class Cylinder(Shape):
-    def __init__(self, radius, height, sectors, origin, filepath):
-        super().__init__(filepath)
+    def __init__(self, radius, height, sectors, origin, filepath, stl_format=None):
+        super().__init__(filepath, stl_format)
         self.radius = radius
         self.height = height
         self.sectors = sectors
         self.origin = np.array(origin, dtype=np.float32)
 
-    def tessellate(self):
-        vertices = []
-        faces = []
+    def cache_key(self):
+        return ("Cylinder", self.radius, self.height, self.sectors)
 
-        # Вершини для нижньої та верхньої основ
-        for i in range(self.sectors):
-            theta = 2.0 * np.pi * i / self.sectors
-            x = self.radius * np.cos(theta)
-            y = self.radius * np.sin(theta)
-            # Нижня основа (z = 0)
-            vertices.append([x, y, 0])
-            # Верхня основа (z = height)
-            vertices.append([x, y, self.height])
+    def unit_geometry(self):
+        i = np.arange(self.sectors)
+        next_i = (i + 1) % self.sectors
 
-        # Центри основ
-        vertices.append([0, 0, 0])  # центр нижньої основи
-        vertices.append([0, 0, self.height])  # центр верхньої основи
+        # Вершини для нижньої та верхньої основ: (2i) - нижня (z = 0), (2i + 1) - верхня (z = height)
+        theta = 2.0 * np.pi * i / self.sectors
+        rings = np.empty((self.sectors, 2, 3))
+        rings[:, :, 0] = (self.radius * np.cos(theta))[:, None]
+        rings[:, :, 1] = (self.radius * np.sin(theta))[:, None]
+        rings[:, 0, 2] = 0
+        rings[:, 1, 2] = self.height
 
-        vertices = np.array(vertices, dtype=np.float32) + self.origin
+        # Центри основ
+        centers = [[0, 0, 0], [0, 0, self.height]]
+        vertices = np.concatenate([rings.reshape(-1, 3), centers]).astype(np.float32)
 
         # Грані
-        # Нижня основа
-        center_bottom = len(vertices) - 2
-        for i in range(self.sectors):
-            next_i = (i + 1) % self.sectors
-            faces.append([center_bottom, 2 * next_i, 2 * i])
-
-        # Верхня основа
-        center_top = len(vertices) - 1
-        for i in range(self.sectors):
-            next_i = (i + 1) % self.sectors
-            faces.append([center_top, 2 * i + 1, 2 * next_i + 1])
-
-        # Бічна поверхня
-        for i in range(self.sectors):
-            next_i = (i + 1) % self.sectors
-            # Два трикутники для кожної бічної грані
-            faces.append([2 * i, 2 * next_i, 2 * i + 1])
-            faces.append([2 * next_i, 2 * next_i + 1, 2 * i + 1])
-
-        faces = np.array(faces, dtype=np.uint32)
+        center_bottom = np.full(self.sectors, len(vertices) - 2)
+        center_top = np.full(self.sectors, len(vertices) - 1)
+        bottom = np.stack([center_bottom, 2 * next_i, 2 * i], axis=1)
+        top = np.stack([center_top, 2 * i + 1, 2 * next_i + 1], axis=1)
+        # Бічна поверхня: два трикутники для кожної бічної грані
+        sides = np.stack([2 * i, 2 * next_i, 2 * i + 1,
+                          2 * next_i, 2 * next_i + 1, 2 * i + 1], axis=1).reshape(-1, 3)
+
+        faces = np.concatenate([bottom, top, sides]).astype(np.uint32)
         return vertices, faces
 
     def execute(self):
@@ -0,0 +1,22 @@
+from geometry.decimate import decimate
+from Parsers.stl import STLParser
+from tesselation.command import Shape
+
+
+class Decimate(Shape):
+    def __init__(self, input_filepath, filepath, stl_format=None, target=None, ratio=None, max_error=None):
+        super().__init__(filepath, stl_format)
+        self.input_filepath = input_filepath
+        self.target = target
+        self.ratio = ratio
+        self.max_error = max_error
+
+    def execute(self):
+        parser = STLParser()
+        parser.load(self.input_filepath)
+        target = self.target
+        if target is None and self.ratio is not None:
+            target = int(len(parser.faces) * self.ratio)
+        vertices, faces = decimate(parser.vertices, parser.faces, target, self.max_error)
+        print(f"Decimated {len(parser.faces)} -> {len(faces)} facets")
+        self.save_stl(vertices, faces)
@@ -0,0 +1,106 @@
+import queue
+import threading
+
+import numpy as np
+
+from Parsers.mapped import iter_facets
+from Parsers.stl import STLWriter
+from tesselation.command import Shape
+
+# Facets read per step (about 12 MB per chunk for binary input)
+MERGE_CHUNK_SIZE = 1 << 18
+# Chunks read ahead of the writer; with the chunk size this bounds memory use
+MERGE_QUEUE_DEPTH = 4
+
+_DONE = object()
+
+
+def snap_to_grid(triangles, eps):
+    """Round corners to multiples of eps, so nearly equal vertices of different parts become equal.
+
+    Needs no memory beyond the chunk, unlike a weld (geometry.weld), but it is lossy: every
+    corner moves by up to eps/2 per axis, points closer than eps on either side of a cell
+    boundary still round apart, and facets that collapse (two corners on the same grid point)
+    are dropped.
+    """
+    snapped = (np.round(np.asarray(triangles, dtype=np.float64) / eps) * eps).astype(np.float32)
+    collapsed = (np.all(snapped[:, 0] == snapped[:, 1], axis=1) | np.all(snapped[:, 1] == snapped[:, 2], axis=1) |
+                 np.all(snapped[:, 2] == snapped[:, 0], axis=1))
+    return snapped[~collapsed]
+
+
+class Merge(Shape):
+    """Stream the facets of many STL files, ASCII or binary, into one file.
+
+    Inputs are read chunk by chunk on a reader thread while the main thread writes, with at
+    most MERGE_QUEUE_DEPTH chunks in flight, so memory use does not depend on the number or
+    size of inputs. offsets, if given, holds an (x, y, z) translation per input. snap_eps snaps
+    every corner to a grid of that size (see snap_to_grid for what that loses). The binary
+    facet count is patched into the header when the output is closed.
+    """
+
+    def __init__(self, inputs, filepath, stl_format=None, offsets=None, snap_eps=None):
+        super().__init__(filepath, stl_format)
+        self.inputs = list(inputs)
+        if offsets is not None and len(offsets) != len(self.inputs):
+            raise ValueError(f"Got {len(offsets)} offsets for {len(self.inputs)} inputs")
+        self.offsets = offsets
+        self.snap_eps = snap_eps
+        self.dropped = 0
+
+    def put(self, chunks, item):
+        # Gives up once the writer has stopped, instead of blocking on a full queue forever
+        while not self.stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def read(self, chunks):
+        """Reader thread: put (normals, triangles) chunks on the queue, then _DONE or the error."""
+        try:
+            for index, filepath in enumerate(self.inputs):
+                offset = None
+                if self.offsets is not None and np.any(self.offsets[index]):
+                    offset = np.asarray(self.offsets[index], dtype=np.float32)
+                for normals, triangles in iter_facets(filepath, MERGE_CHUNK_SIZE):
+                    # Copy out of the mapping here, so the reading happens on this thread
+                    triangles = np.array(triangles, dtype=np.float32)
+                    normals = np.array(normals, dtype=np.float32)
+                    if offset is not None:
+                        triangles += offset
+                    if self.snap_eps:
+                        count = len(triangles)
+                        triangles = snap_to_grid(triangles, self.snap_eps)
+                        self.dropped += count - len(triangles)
+                        normals = None  # recomputed for the snapped corners
+                    if self.stopped.is_set():
+                        return
+                    self.put(chunks, (normals, triangles))
+            self.put(chunks, _DONE)
+        except Exception as e:
+            self.put(chunks, e)
+
+    def execute(self):
+        chunks = queue.Queue(MERGE_QUEUE_DEPTH)
+        self.stopped = threading.Event()
+        reader = threading.Thread(target=self.read, args=(chunks,), daemon=True)
+        reader.start()
+        try:
+            with STLWriter(self.filepath, self.stl_format) as writer:
+                while True:
+                    chunk = chunks.get()
+                    if chunk is _DONE:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    normals, triangles = chunk
+                    writer.write(triangles, normals)
+        finally:
+            self.stopped.set()
+            reader.join()
+        if self.dropped:
+            print(f"Dropped {self.dropped} facets that collapsed when snapping to the grid")
+        print(f"Merged {len(self.inputs)} files, {writer.count} facets")
+        print(f"STL saved to {self.filepath}")
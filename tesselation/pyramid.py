@@ -3,13 +3,16 @@ import numpy as np
 
 
 class Pyramid(Shape):
-    def __init__(self, base_size, height, origin, filepath):
-        super().__init__(filepath)
+    def __init__(self, base_size, height, origin, filepath, stl_format=None):
+        super().__init__(filepath, stl_format)
         self.base_size = base_size
         self.height = height
         self.origin = np.array(origin, dtype=np.float32)
 
-    def tessellate(self):
+    def cache_key(self):
+        return ("Pyramid", self.base_size, self.height)
+
+    def unit_geometry(self):
         # Вершини піраміди
         half_base = self.base_size / 2.0
         vertices = np.array([
@@ -20,7 +23,7 @@ class Pyramid(Shape):
             [-half_base,  half_base, 0],  # 3
             # Вершина піраміди
             [0, 0, self.height]           # 4
-        ], dtype=np.float32) + self.origin
+        ], dtype=np.float32)
 
         # Грані
         faces = np.array([
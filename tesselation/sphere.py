@@ -3,8 +3,8 @@ from tesselation.command import Shape
 
 
 class Sphere(Shape):
-    def __init__(self, R, origin, N, filepath = ""):
-        super().__init__(filepath)
+    def __init__(self, R, origin, N, filepath = "", stl_format=None):
+        super().__init__(filepath, stl_format)
         self.R = R
         self.origin = np.array(origin)
         self.N = N
@@ -13,25 +13,25 @@ class Sphere(Shape):
         vertices, faces = self.tessellate()
         self.save_stl(vertices, np.array(faces))
 
-    def tessellate(self):
-        vertices = []
-        faces = []
-        for i in range(self.N + 1):
-            phi = i * np.pi / self.N
-            for j in range(self.N + 1):
-                theta = j * 2 * np.pi / self.N
-                x = self.R * np.sin(phi) * np.cos(theta)
-                y = self.R * np.sin(phi) * np.sin(theta)
-                z = self.R * np.cos(phi)
-                vertices.append([x, y, z])
-        vertices = np.array(vertices) + self.origin
-        for i in range(self.N):
-            for j in range(self.N):
-                v0 = i * (self.N + 1) + j
-                v1 = v0 + 1
-                v2 = (i + 1) * (self.N + 1) + j
-                v3 = v2 + 1
-                faces.append([v0, v1, v2])
-                faces.append([v1, v3, v2])
+    def cache_key(self):
+        return ("Sphere", self.R, self.N)
 
-        return vertices, np.array(faces)
+    def unit_geometry(self):
+        # (N + 1) x (N + 1) grid over latitude phi and longitude theta
+        steps = np.arange(self.N + 1)
+        phi = (steps * np.pi / self.N)[:, None]
+        theta = (steps * 2 * np.pi / self.N)[None, :]
+        vertices = np.stack(np.broadcast_arrays(
+            self.R * np.sin(phi) * np.cos(theta),
+            self.R * np.sin(phi) * np.sin(theta),
+            self.R * np.cos(phi),
+        ), axis=-1).reshape(-1, 3)
+
+        # Two triangles per grid cell
+        v0 = (steps[:-1, None] * (self.N + 1) + steps[None, :-1]).ravel()
+        v1 = v0 + 1
+        v2 = v0 + self.N + 1
+        v3 = v2 + 1
+        faces = np.stack([v0, v1, v2, v1, v3, v2], axis=1).reshape(-1, 3)
+
+        return vertices, faces
@@ -1,26 +1,30 @@
-import numpy as np
-from stl import mesh
+from geometry.subdivide import subdivide
+from geometry.weld import weld
+from Parsers.mapped import iter_facets
+from Parsers.stl import STLWriter
 from tesselation.command import Shape
 
+# Output facets produced per step; input is cut into pieces that subdivide to about this many
+SPLIT_CHUNK_SIZE = 1 << 20
+
 
 class Split(Shape):
-    def __init__(self, input_filepath, filepath):
-        super().__init__(filepath)
+    def __init__(self, input_filepath, filepath, stl_format=None, levels=1, scheme='midpoint'):
+        super().__init__(filepath, stl_format)
         self.input_filepath = input_filepath
+        self.levels = levels
+        self.scheme = scheme
 
     def execute(self):
-        input_mesh = mesh.Mesh.from_file(self.input_filepath)
-        vertices = input_mesh.vectors.reshape(-1, 3)
-        faces = np.arange(len(vertices)).reshape(-1, 3)
-
-        new_vertices = []
-        new_faces = []
-        for f in faces:
-            v0, v1, v2 = vertices[f[0]], vertices[f[1]], vertices[f[2]]
-            v01 = (v0 + v1) / 2
-            new_vertices.extend([v0, v01, v2])
-            new_vertices.extend([v1, v01, v2])
-            new_faces.append([len(new_vertices) - 6, len(new_vertices) - 5, len(new_vertices) - 4])
-            new_faces.append([len(new_vertices) - 3, len(new_vertices) - 2, len(new_vertices) - 1])
-
-        self.save_stl(np.array(new_vertices), np.array(new_faces))
\ No newline at end of file
+        # Facets are streamed from the input (memory-mapped when binary) straight to the output,
+        # so the input may be larger than RAM. Each piece is welded and subdivided as an indexed
+        # mesh; midpoints only depend on the edge's end points, so pieces still meet exactly.
+        growth = (2 if self.scheme == 'bisect' else 4) ** self.levels
+        step = max(1, SPLIT_CHUNK_SIZE // growth)
+        with STLWriter(self.filepath, self.stl_format) as writer:
+            for _, triangles in iter_facets(self.input_filepath):
+                for start in range(0, len(triangles), step):
+                    vertices, inverse, _ = weld(triangles[start:start + step].reshape(-1, 3))
+                    vertices, faces = subdivide(vertices, inverse.reshape(-1, 3), self.levels, self.scheme)
+                    writer.write(vertices[faces])
+        print(f"STL saved to {self.filepath}")
@@ -0,0 +1,38 @@
+import numpy as np
+
+from geometry.normals import vertex_normals
+from Parsers.stl import STLParser
+from src.Mode_Controller import RenderMode
+from src.Raster import SoftwareRenderer, write_png
+
+
+class Thumbnail:
+    """Render a PNG preview of an STL file without a display or GPU.
+
+    With views > 1 the image is a turntable strip: the mesh seen from views azimuths spread
+    evenly around it, side by side.
+    """
+
+    def __init__(self, input_filepath, filepath, size=256, views=1, mode="FILLED", elevation=25.0, supersample=1):
+        self.input_filepath = input_filepath
+        self.filepath = filepath
+        self.size = size
+        self.views = views
+        self.mode = RenderMode[mode.upper()] if isinstance(mode, str) else mode
+        self.elevation = elevation
+        self.supersample = supersample
+
+    def execute(self):
+        parser = STLParser()
+        parser.load(self.input_filepath)
+        vertices, faces = parser.vertices, parser.faces
+
+        renderer = SoftwareRenderer(self.size, self.size, self.mode, self.supersample)
+        normals = vertex_normals(vertices, faces) if len(faces) else None
+        images = []
+        for view in range(self.views):
+            if len(faces):
+                renderer.frame(vertices, azimuth=360.0 * view / self.views, elevation=self.elevation)
+            images.append(renderer.render(vertices, faces, normals))
+        write_png(self.filepath, np.concatenate(images, axis=1))
+        print(f"Thumbnail saved to {self.filepath}")
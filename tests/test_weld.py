@@ -0,0 +1,56 @@
+import numpy as np
+
+from geometry.weld import weld, weld_mesh
+
+
+def test_close_points_in_neighbouring_cells_are_welded():
+    # 0.99e-3 shares a cell with the origin; 1.01e-3 is in the next cell but 0.02e-3 away
+    points = np.array([[0.0, 0.0, 0.0], [0.99e-3, 0.0, 0.0], [1.01e-3, 0.0, 0.0]])
+    vertices, inverse, merged = weld(points, 1e-3)
+    assert inverse.tolist() == [0, 0, 0]
+    assert merged == 2
+    assert vertices.tolist() == [[0.0, 0.0, 0.0]]
+
+
+def test_points_further_than_eps_in_one_cell_are_kept():
+    points = np.array([[0.01, 0.01, 0.01], [0.99, 0.99, 0.99]])
+    vertices, inverse, merged = weld(points, 1.0)
+    assert inverse.tolist() == [0, 1]
+    assert merged == 0
+
+
+def test_chains_merge_only_through_close_pairs():
+    chain = np.zeros((20, 3))
+    chain[:, 0] = np.arange(20) * 0.9e-3
+    assert len(weld(chain, 1e-3)[0]) == 1
+    chain[:, 0] = np.arange(20) * 1.1e-3
+    assert len(weld(chain, 1e-3)[0]) == 20
+
+
+def test_matches_brute_force_clusters():
+    rng = np.random.default_rng(0)
+    eps = 0.05
+    for scale in (0.05, 0.2, 1.0):
+        points = (rng.random((80, 3)) * scale).astype(np.float32)
+        _, inverse, _ = weld(points, eps)
+        close = np.linalg.norm(points[:, None].astype(np.float64) - points[None], axis=2) <= eps
+        labels = np.arange(len(points))
+        for _ in range(len(points)):
+            labels = np.array([labels[row].min() for row in close])
+        assert np.array_equal(inverse[:, None] == inverse[None], labels[:, None] == labels[None])
+
+
+def test_exact_weld_keeps_first_occurrence_order():
+    points = np.array([[1, 0, 0], [0, 0, 0], [1, 0, 0], [-0.0, 0, 0]], dtype=np.float32)
+    vertices, inverse, merged = weld(points)
+    assert vertices.tolist() == [[1, 0, 0], [0, 0, 0]]
+    assert inverse.tolist() == [0, 1, 0, 1]
+    assert merged == 2
+
+
+def test_weld_mesh_remaps_faces():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1e-9, 0, 0]])
+    faces = np.array([[0, 1, 2], [3, 2, 1]])
+    welded, faces, merged = weld_mesh(vertices, faces, 1e-6)
+    assert merged == 1
+    assert faces.tolist() == [[0, 1, 2], [0, 2, 1]]